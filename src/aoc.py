@@ -0,0 +1,366 @@
+"""
+Advent Of Code 2021 shared helpers
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import pstats
+import shutil
+import cProfile
+import pathlib
+import argparse
+import tempfile
+import functools
+import itertools
+import importlib
+import importlib.abc
+import importlib.util
+import importlib.machinery
+import contextlib
+import statistics
+import tracemalloc
+import concurrent.futures
+
+from types import ModuleType
+from typing import (Any, BinaryIO, Callable, Iterator, NamedTuple, Optional, Sequence,
+                    TextIO, TypeVar, Union)
+
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+SRC_DIR = REPO_ROOT / 'src'
+INPUT_DIR = REPO_ROOT / 'input'
+
+day_re = re.compile(r"d(?P<day_num>[0-9]+)")
+puzzle_re = re.compile(r"(?P<day>d[0-9]+)(?P<part>[^ ]+) (?P<input_file>[^ ]+) (?P<result>.*?)"
+                       r"(?: <(?P<budget>[0-9.]+)s)?$")
+
+# Input file name for stdin
+STDIN = '-'
+# Inputs are read in chunks this big (bytes)
+CHUNK_SIZE = 1 << 20
+# Files smaller than this aren't worth starting a process pool for
+PARALLEL_MIN_BYTES = 8 << 20
+# Largest byte range of the input one pool worker handles in one go
+MAX_CHUNK_BYTES = 64 << 20
+
+# A path to an input file (STDIN for stdin) or an open binary stream
+InputType = Union[str, BinaryIO]
+PartFunction = Callable[[InputType], Any]
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def day_names() -> list[str]:
+    """All the day modules in src/ in day order (d1, d2, ... d25)"""
+    days = [soln.stem for soln in SRC_DIR.glob('d*.py')
+            if day_re.fullmatch(soln.stem)]
+    return sorted(days, key=lambda day: int(day[1:]))
+
+
+def input_path(day: str, example: bool = False) -> pathlib.Path:
+    return INPUT_DIR / (f"{day}-example" if example else day)
+
+
+def is_stream(input_file: InputType) -> bool:
+    """True when the input can only be read once, i.e. stdin or an open stream"""
+    return not isinstance(input_file, str) or input_file == STDIN
+
+
+@contextlib.contextmanager
+def open_input(input_file: InputType) -> Iterator[TextIO]:
+    """
+    The input as a text stream read in large buffered chunks. A stream passed
+    in is left open for the caller.
+    """
+    if isinstance(input_file, str) and input_file != STDIN:
+        with open(input_file, buffering=CHUNK_SIZE) as f:
+            yield f
+        return
+
+    with contextlib.ExitStack() as stack:
+        if isinstance(input_file, str):
+            binary: BinaryIO = stack.enter_context(
+                open(sys.stdin.fileno(), 'rb', buffering=CHUNK_SIZE, closefd=False))
+        else:
+            binary = input_file
+        text = io.TextIOWrapper(binary)
+        try:
+            yield text
+        finally:
+            # Don't let the wrapper close the stream
+            text.detach()
+
+
+@contextlib.contextmanager
+def spooled_stdin() -> Iterator[str]:
+    """Copy stdin to a temporary file for when it needs reading more than once"""
+    with tempfile.NamedTemporaryFile(prefix='aoc-stdin-') as spool:
+        with open(sys.stdin.fileno(), 'rb', buffering=CHUNK_SIZE, closefd=False) as stdin:
+            shutil.copyfileobj(stdin, spool, CHUNK_SIZE)
+        spool.flush()
+        yield spool.name
+
+
+def chunk_bounds(input_file: str, num_chunks: int) -> list[int]:
+    """Offsets splitting the file into num_chunks byte ranges of whole lines"""
+    size = os.path.getsize(input_file)
+    bounds = [0]
+    with open(input_file, 'rb') as f:
+        for chunk_num in range(1, num_chunks):
+            f.seek(max(size * chunk_num // num_chunks, bounds[-1]))
+            # Move on to the start of the next line
+            f.readline()
+            bounds.append(f.tell())
+    bounds.append(size)
+    return bounds
+
+
+def _map_chunk(chunk_function: Callable[[bytes], T], input_file: str,
+               start: int, end: int) -> T:
+    """Runs in a pool worker"""
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        return chunk_function(f.read(end - start))
+
+
+def map_chunks(chunk_function: Callable[[bytes], T], input_file: str,
+               max_chunk_bytes: int) -> list[T]:
+    """
+    Split a file into byte ranges of whole lines, at least one per CPU, and
+    call chunk_function with the bytes of each in a process pool. The results
+    are in the order of the ranges in the file.
+    """
+    num_workers = os.cpu_count() or 1
+    num_chunks = max(num_workers, os.path.getsize(input_file) // max_chunk_bytes + 1)
+    bounds = chunk_bounds(input_file, num_chunks)
+    with concurrent.futures.ProcessPoolExecutor(num_workers) as pool:
+        return list(pool.map(_map_chunk, itertools.repeat(chunk_function),
+                             itertools.repeat(input_file), bounds[:-1], bounds[1:]))
+
+
+def _call_with_lines(line_function: Callable[[list[str]], T], chunk: bytes) -> T:
+    return line_function(chunk.decode().splitlines())
+
+
+def map_line_chunks(line_function: Callable[[list[str]], T], input_file: str,
+                    max_chunk_bytes: int) -> list[T]:
+    """map_chunks calling line_function with the lines of each chunk"""
+    return map_chunks(functools.partial(_call_with_lines, line_function),
+                      input_file, max_chunk_bytes)
+
+
+def map_reduce_chunks(chunk_function: Callable[[bytes], T], reducer: Callable[[list[T]], R],
+                      input_file: InputType, max_chunk_bytes: Optional[int] = None) -> R:
+    """
+    Call chunk_function with each chunk of whole lines of the input and
+    reducer with the list of results, in the order of the chunks. Files of
+    at least PARALLEL_MIN_BYTES are split over a process pool by map_chunks
+    (in chunks of at most max_chunk_bytes, MAX_CHUNK_BYTES by default),
+    smaller files and streams are read through CHUNK_SIZE at a time.
+    """
+    if (isinstance(input_file, str) and input_file != STDIN and
+            os.path.getsize(input_file) >= PARALLEL_MIN_BYTES):
+        return reducer(map_chunks(chunk_function, input_file,
+                                  max_chunk_bytes or MAX_CHUNK_BYTES))
+    with open_input(input_file) as f:
+        return reducer([chunk_function(''.join(lines).encode())
+                        for lines in iter(lambda: f.readlines(CHUNK_SIZE), [])])
+
+
+def map_reduce_line_chunks(line_function: Callable[[list[str]], T],
+                           reducer: Callable[[list[T]], R], input_file: InputType,
+                           max_chunk_bytes: Optional[int] = None) -> R:
+    """map_reduce_chunks calling line_function with the lines of each chunk"""
+    return map_reduce_chunks(functools.partial(_call_with_lines, line_function),
+                             reducer, input_file, max_chunk_bytes)
+
+
+def import_day(day: str) -> ModuleType:
+    return importlib.import_module(day)
+
+
+def is_compiled(module_name: str) -> bool:
+    """True if importing the module would load a compiled (mypyc) extension"""
+    spec = importlib.util.find_spec(module_name)
+    return (spec is not None and spec.origin is not None and
+            spec.origin.endswith(tuple(importlib.machinery.EXTENSION_SUFFIXES)))
+
+
+class SourceFinder(importlib.abc.MetaPathFinder):
+    """Import the modules in src/ from source even when compiled ones are built"""
+    def find_spec(self, fullname: str, path: Optional[Sequence[str]],
+                  target: Optional[ModuleType] = None) -> Optional[importlib.machinery.ModuleSpec]:
+        source = SRC_DIR / f"{fullname}.py"
+        if path is not None or not source.exists():
+            return None
+        return importlib.util.spec_from_file_location(fullname, source)
+
+
+if os.environ.get('AOC_INTERPRETED'):
+    sys.meta_path.insert(0, SourceFinder())
+
+
+def part_functions(day_mod: ModuleType) -> list[tuple[str, PartFunction]]:
+    """The entry points of a day, either p1p2 or the separate p1 and p2"""
+    if hasattr(day_mod, 'p1p2'):
+        return [('p1p2', day_mod.p1p2)]
+    return [(part, getattr(day_mod, part)) for part in ('p1', 'p2')
+            if hasattr(day_mod, part)]
+
+
+class Puzzle(NamedTuple):
+    day: str
+    part: str
+    input_file: str
+    result: str
+    budget: Optional[float] = None  # Seconds the part is allowed to take
+
+    @property
+    def is_example(self) -> bool:
+        return 'example' in pathlib.Path(self.input_file).name
+
+    @property
+    def name(self) -> str:
+        return f"{self.day}{self.part} {pathlib.Path(self.input_file).name}"
+
+
+def get_puzzles(examples: Optional[bool] = None) -> list[Puzzle]:
+    """
+    The puzzles listed in the answers file, filtered to either the example or
+    the full inputs if examples is given
+    """
+    puzzles = []
+    with open(REPO_ROOT / 'answers') as f:
+        for line in f:
+            m = puzzle_re.match(line)
+            if m is None:
+                continue
+            puzzle = Puzzle(m.group('day'), m.group('part'),
+                            str(INPUT_DIR / m.group('input_file')),
+                            m.group('result'),
+                            float(m.group('budget')) if m.group('budget') else None)
+            if examples is None or puzzle.is_example == examples:
+                puzzles.append(puzzle)
+    return puzzles
+
+
+def parse_main_args(cli_args: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input_file', help=f"Input file or {STDIN} for stdin")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile the first (cold) call of each part with cProfile")
+    parser.add_argument('--memory', action='store_true',
+                        help="Trace the memory allocated by the first call of each part")
+    parser.add_argument('--repeat', type=int, default=0, metavar='N',
+                        help="Time N more (warm) calls of each part after the first")
+    parser.add_argument('--top', type=int, default=15, metavar='N',
+                        help="Number of functions/allocation sites to report")
+    parser.add_argument('--json', action='store_true',
+                        help="Print a JSON report rather than text")
+    return parser.parse_args(cli_args)
+
+
+def profile_report(profiler: cProfile.Profile, top: int) -> list[dict[str, Any]]:
+    """The functions taking the most time excluding the time in their callees"""
+    stats = pstats.Stats(profiler).stats  # type: ignore
+    hottest = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    return [{'function': f"{pathlib.Path(file).name}:{line}({func})",
+             'calls': calls, 'tottime': tottime, 'cumtime': cumtime}
+            for (file, line, func), (_, calls, tottime, cumtime, _) in hottest]
+
+
+def memory_report(snapshot: tracemalloc.Snapshot, peak: int, top: int) -> dict[str, Any]:
+    # Only allocations still alive at the end of the call are in the snapshot
+    sites = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    return {'peak': peak,
+            'top_sites': [{'site': str(stat.traceback), 'size': stat.size, 'count': stat.count}
+                          for stat in sites.statistics('lineno')[:top]]}
+
+
+def run_part(part_function: PartFunction, args: argparse.Namespace) -> dict[str, Any]:
+    part_report: dict[str, Any] = {'part': part_function.__name__}
+
+    profiler = cProfile.Profile() if args.profile else None
+    if args.memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    if profiler:
+        result = profiler.runcall(part_function, args.input_file)
+    else:
+        result = part_function(args.input_file)
+    part_report['cold'] = time.perf_counter() - start
+    part_report['result'] = result
+    if args.memory:
+        _, peak = tracemalloc.get_traced_memory()
+        part_report['memory'] = memory_report(tracemalloc.take_snapshot(), peak, args.top)
+        tracemalloc.stop()
+    if profiler:
+        part_report['profile'] = profile_report(profiler, args.top)
+
+    if args.repeat:
+        warm_times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            part_function(args.input_file)
+            warm_times.append(time.perf_counter() - start)
+        part_report['warm'] = {'runs': args.repeat,
+                               'median': statistics.median(warm_times),
+                               'min': min(warm_times)}
+    return part_report
+
+
+def print_part_report(part_report: dict[str, Any]) -> None:
+    print(part_report['result'])
+    if 'warm' in part_report:
+        warm = part_report['warm']
+        print(f"{part_report['part']}: cold {part_report['cold']:.6f}s, "
+              f"warm median {warm['median']:.6f}s min {warm['min']:.6f}s "
+              f"over {warm['runs']} runs")
+    if 'profile' in part_report:
+        print(f"{part_report['part']} hottest functions:")
+        print(f"{'calls':>10} {'tottime':>10} {'cumtime':>10}  function")
+        for func in part_report['profile']:
+            print(f"{func['calls']:>10} {func['tottime']:>10.6f} "
+                  f"{func['cumtime']:>10.6f}  {func['function']}")
+    if 'memory' in part_report:
+        memory = part_report['memory']
+        print(f"{part_report['part']} peak memory {memory['peak'] / 1024:.1f}KiB, "
+              f"largest allocations still alive:")
+        for site in memory['top_sites']:
+            print(f"{site['size'] / 1024:>10.1f}KiB {site['count']:>8}  {site['site']}")
+
+
+def main(cli_args: list[str], *part_functions: PartFunction) -> int:
+    """
+    The command line for every day, runs each part on the input file and
+    prints the results with timings plus profiling if asked for
+    """
+    args = parse_main_args(cli_args)
+    input_file = args.input_file
+
+    part_reports = []
+    # Keep stdout for the JSON, the solutions print their own debug output
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout))
+        if input_file == STDIN and (len(part_functions) > 1 or args.repeat):
+            args.input_file = stack.enter_context(spooled_stdin())
+        for part_function in part_functions:
+            part_reports.append(run_part(part_function, args))
+            if not args.json:
+                print_part_report(part_reports[-1])
+    elapsed = sum(part_report['cold'] for part_report in part_reports)
+
+    if args.json:
+        for part_report in part_reports:
+            part_report['result'] = repr(part_report['result'])
+        json.dump({'input_file': input_file, 'elapsed': elapsed,
+                   'parts': part_reports}, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"Elapsed: {elapsed:.6f}s")
+    return 0
@@ -0,0 +1,244 @@
+#!/bin/env python3
+"""
+Benchmark every puzzle in the answers file against a saved baseline
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import pathlib
+import platform
+import statistics
+import contextlib
+import tracemalloc
+
+from typing import Any, Optional
+
+import aoc
+import generate
+import input_cache
+
+
+BASELINE_VERSION = 1
+DEFAULT_BASELINE = aoc.REPO_ROOT / '.benchmarks' / 'baseline.json'
+
+BenchResults = dict[str, dict[str, float]]
+
+
+def time_part(part_function: aoc.PartFunction, input_file: str,
+              warmup: int, trials: int) -> dict[str, float]:
+    times = []
+    # The solutions print their own debug output, keep that out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            part_function(input_file)
+        for _ in range(trials):
+            start = time.perf_counter()
+            part_function(input_file)
+            times.append(time.perf_counter() - start)
+
+        # tracemalloc slows everything down so measure memory separately
+        tracemalloc.start()
+        part_function(input_file)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'median': statistics.median(times),
+        'p95': (statistics.quantiles(times, n=20, method='inclusive')[-1]
+                if len(times) > 1 else times[0]),
+        'min': min(times),
+        'peak_memory': peak_memory,
+    }
+
+
+def time_puzzle(puzzle: aoc.Puzzle, warmup: int, trials: int) -> dict[str, float]:
+    part_function = getattr(aoc.import_day(puzzle.day), puzzle.part)
+    return time_part(part_function, puzzle.input_file, warmup, trials)
+
+
+def run_benchmarks(puzzles: list[aoc.Puzzle], warmup: int,
+                   trials: int) -> BenchResults:
+    results = {}
+    for puzzle in puzzles:
+        results[puzzle.name] = time_puzzle(puzzle, warmup, trials)
+        print(f"{puzzle.name:<28} median {results[puzzle.name]['median']:9.6f}s "
+              f"min {results[puzzle.name]['min']:9.6f}s "
+              f"peak {results[puzzle.name]['peak_memory'] / 1024:10.1f}KiB")
+    return results
+
+
+def run_sweep(days: list[str], scales: list[float], seed: int,
+              warmup: int, trials: int) -> dict[str, list[dict[str, float]]]:
+    """Time each day's parts on generated inputs of increasing scale"""
+    curves: dict[str, list[dict[str, float]]] = {}
+    for day in days:
+        for part, part_function in aoc.part_functions(aoc.import_day(day)):
+            curve = curves.setdefault(f"{day}{part}", [])
+            for scale in scales:
+                input_file = generate.generated_input(day, scale, seed)
+                result = time_part(part_function, str(input_file), warmup, trials)
+                curve.append({'scale': scale,
+                              'input_bytes': input_file.stat().st_size,
+                              **result})
+                print(f"{day}{part:<6} x{scale:<8g} {curve[-1]['input_bytes']:>12}B "
+                      f"median {result['median']:9.6f}s "
+                      f"peak {result['peak_memory'] / 1024:10.1f}KiB")
+    return curves
+
+
+def run_variant(args: argparse.Namespace, interpreted: bool) -> BenchResults:
+    """Benchmark in a fresh process importing either the compiled or source modules"""
+    env = dict(os.environ)
+    env.pop('AOC_INTERPRETED', None)
+    if interpreted:
+        env['AOC_INTERPRETED'] = '1'
+    with tempfile.NamedTemporaryFile(mode='r', suffix='.json') as results_file:
+        cmd = [sys.executable, __file__, *args.days, '--warmup', str(args.warmup),
+               '--trials', str(args.trials), '--results-json', results_file.name]
+        if args.examples:
+            cmd.append('--examples')
+        if args.no_input_cache:
+            cmd.append('--no-input-cache')
+        subprocess.run(cmd, env=env, check=True)
+        results: BenchResults = json.load(results_file)
+    return results
+
+
+def compare_compiled(args: argparse.Namespace) -> None:
+    print("Interpreted:")
+    interpreted = run_variant(args, interpreted=True)
+    print("Compiled:")
+    compiled = run_variant(args, interpreted=False)
+    print(f"{'':<28} {'interpreted':>12} {'compiled':>12} {'speedup':>8}")
+    for name, result in interpreted.items():
+        day = name.split('p', 1)[0]
+        speedup = result['median'] / compiled[name]['median']
+        print(f"{name:<28} {result['median']:11.6f}s {compiled[name]['median']:11.6f}s "
+              f"{speedup:7.2f}x{'' if aoc.is_compiled(day) else '  (not compiled)'}")
+
+
+def load_baseline(baseline_file: str) -> Optional[BenchResults]:
+    try:
+        with open(baseline_file) as f:
+            baseline: dict[str, Any] = json.load(f)
+    except FileNotFoundError:
+        return None
+    if baseline.get('version') != BASELINE_VERSION:
+        print(f"Ignoring baseline {baseline_file} with version "
+              f"{baseline.get('version')}, expected {BASELINE_VERSION}")
+        return None
+    results: BenchResults = baseline['results']
+    return results
+
+
+def save_baseline(baseline_file: str, results: BenchResults) -> None:
+    path = pathlib.Path(baseline_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'version': BASELINE_VERSION,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'results': results,
+        }, f, indent=2, sort_keys=True)
+
+
+def find_regressions(results: BenchResults, baseline: BenchResults,
+                     threshold: float) -> list[str]:
+    """Names of the puzzles whose median time is threshold (a fraction) slower"""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<28} no baseline")
+            continue
+        ratio = result['median'] / baseline[name]['median']
+        regressed = ratio > 1 + threshold
+        print(f"{name:<28} {ratio:6.2f}x baseline"
+              f"{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args(cli_args: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('days', nargs='*',
+                        help="Only benchmark these days e.g. d1 d15")
+    parser.add_argument('--examples', action='store_true',
+                        help="Benchmark the example inputs as well")
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--trials', type=int, default=5)
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+    parser.add_argument('--save', action='store_true',
+                        help="Save the results as the new baseline")
+    parser.add_argument('--no-input-cache', action='store_true',
+                        help="Parse the input on every call rather than "
+                             "using the parsed input cache")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Fractional slow down of the median counted as "
+                             "a regression (default: %(default)s)")
+    parser.add_argument('--sweep', metavar='SCALES',
+                        type=lambda scales: [float(scale) for scale in scales.split(',')],
+                        help="Instead of the answers inputs time generated "
+                             "inputs at these scales e.g. 1,2,4,8")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="Seed for the --sweep generated inputs")
+    parser.add_argument('--sweep-output',
+                        help="Write the --sweep time vs size curves to this JSON file")
+    parser.add_argument('--compare-compiled', action='store_true',
+                        help="Compare the mypyc compiled modules (built by the Taskfile "
+                             "compile task) with the interpreted source")
+    parser.add_argument('--results-json',
+                        help="Write the results to this JSON file rather than "
+                             "checking them against the baseline")
+    return parser.parse_args(cli_args)
+
+
+def main(cli_args: list[str]) -> int:
+    args = parse_args(cli_args)
+    input_cache.enabled = not args.no_input_cache
+
+    if args.sweep:
+        curves = run_sweep(args.days or aoc.day_names(), args.sweep, args.seed,
+                           args.warmup, args.trials)
+        if args.sweep_output:
+            with open(args.sweep_output, 'w') as f:
+                json.dump(curves, f, indent=2)
+        return 0
+
+    if args.compare_compiled:
+        compare_compiled(args)
+        return 0
+
+    puzzles = [puzzle for puzzle in aoc.get_puzzles(None if args.examples else False)
+               if not args.days or puzzle.day in args.days]
+
+    results = run_benchmarks(puzzles, args.warmup, args.trials)
+    if args.results_json:
+        with open(args.results_json, 'w') as f:
+            json.dump(results, f)
+        return 0
+
+    regressions = []
+    baseline = load_baseline(args.baseline)
+    if baseline is not None:
+        regressions = find_regressions(results, baseline, args.threshold)
+    if args.save:
+        # Keep the baseline of any puzzles that weren't run this time
+        save_baseline(args.baseline, {**(baseline or {}), **results})
+
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
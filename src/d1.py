@@ -3,45 +3,96 @@
 Advent Of Code 2021 Day 1
 """
 
+from __future__ import annotations
+
 import sys
-import time
-import collections
+import mmap
+import array
+import operator
+
+from typing import Callable, Iterable, Iterator, Sequence
+
+import aoc
+import input_cache
+
+
+# Bytes of input parsed at a time
+CHUNK_SIZE = 1 << 24
+
 
+def split_depths(read: Callable[[int], bytes]) -> Iterator[array.array[int]]:
+    """Parse the depths a chunk of input at a time into arrays"""
+    partial = b''
+    while chunk := read(CHUNK_SIZE):
+        if partial:
+            chunk = partial + chunk
+        depth_strs = chunk.split()
+        # The last depth may carry on into the next chunk
+        partial = depth_strs.pop() if depth_strs and not chunk[-1:].isspace() else b''
+        yield array.array('q', map(int, depth_strs))
+    if partial:
+        yield array.array('q', [int(partial)])
 
-def count_increasing_sliding_windows(filename: str, window_size: int) -> int:
-    increasing: int = 0
 
-    with open(filename) as f:
-        depths = collections.deque(int(next(f))
-                                   for _ in range(window_size))
-        for line in f:
-            depth = int(line)
+def depth_chunks(input_file: aoc.InputType) -> Iterator[array.array[int]]:
+    with aoc.open_input(input_file) as f:
+        if aoc.is_stream(input_file):
+            # Nothing's been read through the text layer so the bytes
+            # underneath can be read directly
+            yield from split_depths(f.buffer.read)
+            return
+        try:
+            depths_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file, which can't be mapped
+            return
+        with depths_map:
+            yield from split_depths(depths_map.read)
+
+
+@input_cache.cached_parser(version=2)
+def read_depths(input_file: aoc.InputType) -> array.array[int]:
+    depths = array.array('q')
+    for chunk in depth_chunks(input_file):
+        depths.extend(chunk)
+    return depths
+
+
+def count_increasing_sliding_windows(input_file: aoc.InputType,
+                                     window_sizes: Sequence[int]) -> list[int]:
+    """The number of times the sum of each size of window increases"""
+    # Streams are only read once, so count them a chunk at a time rather than
+    # holding all of it
+    chunks: Iterable[array.array[int]] = (depth_chunks(input_file) if aoc.is_stream(input_file)
+                                          else [read_depths(input_file)])
+    counts = [0] * len(window_sizes)
+    # The depths from the previous chunk needed to compare with this one
+    tail: array.array[int] = array.array('q')
+    max_window = max(window_sizes)
+    for chunk in chunks:
+        depths = tail + chunk if tail else chunk
+        for window_num, window_size in enumerate(window_sizes):
             # The only elements two consecutive sliding windows differ by is
             # the first and last, so only these need to be compared to see
-            # which window is bigger
-            if depth > depths.popleft():
-                increasing += 1
-            depths.append(depth)
-
-    return increasing
+            # which window is bigger. Only count the lasts in this chunk.
+            first_last = max(len(tail), window_size)
+            counts[window_num] += sum(map(operator.gt, depths[first_last:],
+                                          depths[first_last - window_size:]))
+        tail = depths[-max_window:]
+    return counts
 
 
-def p1(input_file: str) -> int:
-    return count_increasing_sliding_windows(input_file, 1)
+def p1(input_file: aoc.InputType) -> int:
+    return count_increasing_sliding_windows(input_file, (1,))[0]
 
 
-def p2(input_file: str) -> int:
-    return count_increasing_sliding_windows(input_file, 3)
+def p2(input_file: aoc.InputType) -> int:
+    return count_increasing_sliding_windows(input_file, (3,))[0]
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1(cli_args[0]))
-    print(p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1, p2)
 
 
 if __name__ == "__main__":
-    sys.exit(main(sys.argv[1:]))
\ No newline at end of file
+    sys.exit(main(sys.argv[1:]))
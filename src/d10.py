@@ -3,57 +3,118 @@
 Advent Of Code 2021 Day 10
 """
 
+import re
 import sys
-import time
-import statistics
-import collections
+import random
 
+import aoc
 
-open_2_close = {'(' : ')', '[' : ']', '{' : '}', '<' : '>'}
-illegal_score = {')' : 3, ']' : 57, '}' : 1197, '>' : 25137}
-complete_score = {')' : 1, ']' : 2, '}' : 3, '>' : 4}
 
+# Passes taking out matched pairs from a whole chunk at once. Each pass takes
+# out at least the innermost pairs, most of a line goes in the first few and
+# lines still not settled after that are finished off a character at a time.
+MAX_STRIP_PASSES = 4
+
+PAIRS = (b'()', b'[]', b'{}', b'<>')
+illegal_score = {ord(')'): 3, ord(']'): 57, ord('}'): 1197, ord('>'): 25137}
+# The completion score of a line is its missing closes as a base 5 number
+# with a digit from 1 to 4 for each, the closes are the opens left reversed.
+# Translating the opens to their digits leaves the closes as they are.
+open_to_digit = bytes.maketrans(b'([{<', b'1234')
+digit_2_close = {ord('1'): ord(')'), ord('2'): ord(']'), ord('3'): ord('}'), ord('4'): ord('>')}
+close_re = re.compile(rb"[)\]}>]")
+# int() converts strings of digits up to this long whatever the interpreter's
+# limit on converting them is set to
+MAX_INT_DIGITS = sys.int_info.str_digits_check_threshold
+
+
+def completion_score(digits: bytes) -> int:
+    """The score of the closes that finish a line leaving opens (as digits) unclosed"""
+    if len(digits) > MAX_INT_DIGITS:
+        # Too long for int() to convert, add up the digits one at a time instead
+        score = 0
+        for digit in reversed(digits):
+            score = score * 5 + digit - ord('0')
+        return score
+    return int(digits[::-1] or b'0', 5)
+
+
+def scan_line(line: bytes) -> tuple[int, bytes]:
+    """The line's first close that doesn't match (0 if none) and the opens left unclosed"""
+    opens = bytearray()
+    for char in line:
+        if char in digit_2_close:
+            opens.append(char)
+        elif not opens or digit_2_close[opens.pop()] != char:
+            return char, b''
+    return 0, bytes(opens)
+
+
+def score_chunk(chunk: bytes) -> tuple[int, list[int]]:
+    """The total corrupt score and each incomplete line's completion score"""
+    # Pairs never span lines so they can be taken out of the whole chunk
+    for _ in range(MAX_STRIP_PASSES):
+        stripped = chunk
+        for pair in PAIRS:
+            stripped = stripped.replace(pair, b'')
+        if len(stripped) == len(chunk):
+            break
+        chunk = stripped
 
-def p1p2(input_file: str) -> tuple[int, int]:
     corrupt_score = 0
-    complete_scores: list[int] = []
-    expected_closes: collections.deque[str] = collections.deque()
-    with open(input_file) as f:
-        for line in f:
-            corrupt = False
-            for char in line.strip():
-                expected_close = open_2_close.get(char, None)
-                if expected_close:
-                    # This is an opening char, add the expected close to the deque
-                    expected_closes.append(expected_close)
-                else:
-                    # This is a closing char, expected or illegal?
-                    corrupt = expected_closes.pop() != char
-                    if corrupt:
-                        break
-
-            if corrupt:
-                corrupt_score += illegal_score[char]
-                expected_closes.clear()
-            else:
-                # Incomplete line
-                line_complete_score = 0
-                while expected_closes:
-                    char = expected_closes.pop()
-                    line_complete_score *= 5
-                    line_complete_score += complete_score[char]
-                complete_scores.append(line_complete_score)
-
-    return (corrupt_score, int(statistics.median(complete_scores)))
+    complete_scores = []
+    # A line left empty had nothing but matched pairs
+    for line in chunk.translate(open_to_digit).splitlines():
+        close = close_re.search(line)
+        if not close:
+            # Only opens left, nothing to close them wrongly
+            complete_scores.append(completion_score(line))
+            continue
+        # Everything before the first close is an open so unless the one just
+        # before it is what it closes that's where the line is corrupt
+        pos = close.start()
+        if not pos or digit_2_close[line[pos - 1]] != line[pos]:
+            corrupt_score += illegal_score[line[pos]]
+            continue
+        # Not all the matched pairs were taken out, go through what's left
+        illegal_close, opens = scan_line(line)
+        if illegal_close:
+            corrupt_score += illegal_score[illegal_close]
+        else:
+            complete_scores.append(completion_score(opens))
+    return corrupt_score, complete_scores
+
+
+def kth_smallest(values: list[int], k: int) -> int:
+    """Quickselect, expected linear time rather than sorting"""
+    while True:
+        pivot = random.choice(values)
+        lower = [value for value in values if value < pivot]
+        if k < len(lower):
+            values = lower
+            continue
+        num_equal = values.count(pivot)
+        if k < len(lower) + num_equal:
+            return pivot
+        k -= len(lower) + num_equal
+        values = [value for value in values if value > pivot]
+
+
+def total_scores(chunk_scores: list[tuple[int, list[int]]]) -> tuple[int, int]:
+    """The total corrupt score and the middle completion score"""
+    corrupt_score = sum(corrupt_score for corrupt_score, _ in chunk_scores)
+    complete_scores = [score for _, scores in chunk_scores for score in scores]
+    # There's always an odd number of incomplete lines
+    return (corrupt_score, kth_smallest(complete_scores, len(complete_scores) // 2))
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    return aoc.map_reduce_chunks(score_chunk, total_scores, input_file)
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
-    sys.exit(main(sys.argv[1:]))
\ No newline at end of file
+    sys.exit(main(sys.argv[1:]))
@@ -4,76 +4,114 @@ Advent Of Code 2021 Day 11
 """
 
 import sys
-import time
-
-from typing import Iterator
-
-
-def adjacent_values(row: int, col: int,
-                    grid_size: int) -> Iterator[tuple[int, int]]:
-    for vert_delta in (-1, 0, 1):
-        for horiz_delta in (-1, 0, 1):
-            if vert_delta or horiz_delta:
-                new_row = row + vert_delta
-                new_col = col + horiz_delta
-                if (new_row >= 0 and new_col >= 0 and
-                    new_row < grid_size and new_col < grid_size):
-                    yield new_row, new_col
-
-
-def count_flashes(grid: list[list[int]],
-                  grid_size: int) -> set[tuple[int, int]]:
-    flashed_coords: set[tuple[int, int]] = set()
-    last_set_size = -1
-    while last_set_size != len(flashed_coords):
-        last_set_size = len(flashed_coords)
-        for row_num, row in enumerate(grid):
-            for col_num in range(grid_size):
-                if row[col_num] > 9:
-                    flashed_coords.add((row_num, col_num))
-                    row[col_num] = -10000
-                    for adj_row, adj_col in adjacent_values(row_num, col_num,
-                                                            grid_size):
-                        grid[adj_row][adj_col] += 1
-    return flashed_coords
-
-
-def p1p2(input_file: str) -> tuple[int, int]:
-    grid_size = 10
+
+from typing import Iterator, Sequence
+
+import aoc
+import grid
+import input_cache
+
+
+# Energy is held bit sliced, plane i a bitboard of the octopuses with bit i
+# of their energy set. Octopuses that haven't flashed are at most 9 before
+# a wave of flashes and gain at most 9 from it (8 neighbours and themselves
+# counted in the 3x3 box) so 5 planes are enough.
+NUM_PLANES = 5
+
+
+@input_cache.cached_parser(version=2)
+def read_energy_levels(input_file: aoc.InputType) -> tuple[str, ...]:
+    with aoc.open_input(input_file) as f:
+        return tuple(f.read().splitlines())
+
+
+def full_add(a: int, b: int, c: int) -> tuple[int, int]:
+    """The sum and carry bitboards of adding three bitboards cell by cell"""
+    a_xor_b = a ^ b
+    return a_xor_b ^ c, (a & b) | (c & a_xor_b)
+
+
+class Octopuses:
+    """
+    A grid of any size stepped with whole-board operations, each wave of
+    flashes within a step costs the same few dozen big int operations
+    however many octopuses flash in it.
+    """
+    def __init__(self, lines: Sequence[str]) -> None:
+        self.bit_grid = grid.BitGrid(len(lines[0]), len(lines))
+        self.num_octopuses = self.bit_grid.size
+        self.planes = [self.bit_grid.board_from_lines(
+                           lines, ''.join(str(level) for level in range(10) if level >> bit & 1))
+                       for bit in range(NUM_PLANES)]
+
+    def box_count(self, board: int) -> list[int]:
+        """Bit sliced count (0 to 9) of the cells set in each cell's 3x3 box"""
+        shift = self.bit_grid.shift
+        # Sum along the rows, then add the row sums above and below
+        left, right = shift(board, d_col=1), shift(board, d_col=-1)
+        row0, row1 = full_add(left, right, board)
+        up0, up1 = shift(row0, d_row=1), shift(row1, d_row=1)
+        down0, down1 = shift(row0, d_row=-1), shift(row1, d_row=-1)
+        count0, carry0 = full_add(up0, down0, row0)
+        twos, fours = full_add(up1, down1, row1)
+        count1, carry1 = twos ^ carry0, twos & carry0
+        return [count0, count1, fours ^ carry1, fours & carry1]
+
+    def step(self) -> int:
+        """Move on a step, returning how many octopuses flashed"""
+        e0, e1, e2, e3, e4 = self.planes
+        # Everyone's energy goes up by one
+        carry = self.bit_grid.full
+        e0, carry = e0 ^ carry, e0 & carry
+        e1, carry = e1 ^ carry, e1 & carry
+        e2, carry = e2 ^ carry, e2 & carry
+        e3 = e3 ^ carry
+
+        flashed = 0
+        flashing = e3 & (e1 | e2)
+        while flashing:
+            flashed |= flashing
+            # A flash counts towards the flashing octopus too but whatever
+            # those that have flashed end up at they go back to 0
+            s0, s1, s2, s3 = self.box_count(flashing)
+            e0, carry = e0 ^ s0, e0 & s0
+            e1, carry = full_add(e1, s1, carry)
+            e2, carry = full_add(e2, s2, carry)
+            e3, carry = full_add(e3, s3, carry)
+            e4 ^= carry
+            flashing = (e4 | (e3 & (e1 | e2))) & ~flashed
+
+        self.planes = [plane & ~flashed for plane in (e0, e1, e2, e3, e4)]
+        return flashed.bit_count()
+
+    def flash_counts(self) -> Iterator[int]:
+        """How many octopuses flash on each step from here on"""
+        while True:
+            yield self.step()
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
     num_part_1_steps = 100
     part1_num_flashes = 0
     step_num_all_flash = 0
     total_flashes = 0
 
-    with open(input_file) as f:
-        grid = [[int(char) for char in line] for line in f.read().splitlines()]
-
-    step_num = 0
-    while not step_num_all_flash:
-        step_num += 1
-        for row in grid:
-            for col_num in range(grid_size):
-                row[col_num] += 1
-
-        flashed_coords = count_flashes(grid, grid_size)
-        total_flashes += len(flashed_coords)
+    octopuses = Octopuses(read_energy_levels(input_file))
+    for step_num, num_flashes in enumerate(octopuses.flash_counts(), start=1):
+        total_flashes += num_flashes
         if step_num == num_part_1_steps:
             part1_num_flashes = total_flashes
-        if len(flashed_coords) == grid_size ** 2:
+        if num_flashes == octopuses.num_octopuses and not step_num_all_flash:
             # Everyone flashed
             step_num_all_flash = step_num
-        for row_num, col_num in flashed_coords:
-            grid[row_num][col_num] = 0
+        if step_num_all_flash and step_num >= num_part_1_steps:
+            break
 
     return (part1_num_flashes, step_num_all_flash)
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
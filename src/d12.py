@@ -6,17 +6,23 @@ Advent Of Code 2021 Day 12
 from __future__ import annotations
 
 import sys
-import time
+
+from typing import Iterator
+
+import aoc
 
 GraphType = dict[str, "Cave"]
 
 
 class Cave:
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, bit: int) -> None:
         self.name = name
         self.isstart = name == 'start'
         self.isend = name == 'end'
         self.issmall = name.islower()
+        # Each small cave has its own bit in a mask of those visited, big
+        # caves can be visited any number of times so have none
+        self.bit = bit if self.issmall else 0
         self.connects: list[Cave] = []
 
     def add_link(self, to_node: Cave) -> None:
@@ -26,40 +32,14 @@ class Cave:
     def from_name(cls, name: str, graph: GraphType) -> Cave:
         node = graph.get(name, None)
         if not node:
-            node = cls(name)
+            node = cls(name, 1 << len(graph))
             graph[name] = node
         return node
 
 
-class Path:
-    def __init__(self, last_cave: Cave, small_caves_visited: frozenset[str],
-                 visited_small_twice: bool = False) -> None:
-        self.last_cave = last_cave
-        self.small_caves_visited = small_caves_visited
-        self.has_visited_small_twice = visited_small_twice
-
-    def add_cave(self, cave: Cave) -> Path:
-        has_visited_small_twice = self.has_visited_small_twice
-        small_caves_visited = self.small_caves_visited
-        if cave.issmall:
-            if cave.name in self.small_caves_visited:
-                has_visited_small_twice = True
-            else:
-                # Only create a new set if we need to
-                small_caves_visited = small_caves_visited | frozenset([cave.name])
-
-        return Path(cave, small_caves_visited, has_visited_small_twice)
-
-    def can_visit(self, node: Cave) -> bool:
-        if self.has_visited_small_twice and node.issmall and not node.isend:
-            return node.name not in self.small_caves_visited
-        else:
-            return True
-
-
-def graph_from_input(input_file: str) -> GraphType:
+def graph_from_input(input_file: aoc.InputType) -> GraphType:
     graph: GraphType = {}
-    with open(input_file) as f:
+    with aoc.open_input(input_file) as f:
         for line in f:
             n1_name, n2_name = line.strip().split('-')
             n1 = Cave.from_name(n1_name, graph)
@@ -72,32 +52,69 @@ def graph_from_input(input_file: str) -> GraphType:
     return graph
 
 
-def extend_path_to_end(path: Path) -> list[Path]:
-    if path.last_cave.isend:
-        return [path]
-
-    paths_to_end = []
-    for next_cave in path.last_cave.connects:
-        if path.can_visit(next_cave):
-            paths_to_end += extend_path_to_end(path.add_cave(next_cave))
-    return paths_to_end
-
-
-def p1p2(input_file: str) -> tuple[int, int]:
+# Ways on to the end from (cave, small caves visited, visited one twice)
+Memo = dict[tuple[Cave, int, bool], int]
+
+
+def ways_on(cave: Cave, visited: int, visited_twice: bool, memo: Memo) -> int:
+    if cave.isend:
+        return 1
+    key = (cave, visited, visited_twice)
+    ways = memo.get(key)
+    if ways is None:
+        visited |= cave.bit
+        ways = 0
+        for next_cave in cave.connects:
+            if not next_cave.bit & visited:
+                ways += ways_on(next_cave, visited, visited_twice, memo)
+            elif not visited_twice:
+                ways += ways_on(next_cave, visited, True, memo)
+        memo[key] = ways
+    return ways
+
+
+def count_paths(start: Cave) -> tuple[int, int]:
+    """
+    The number of paths from start to end visiting small caves at most once,
+    and the number allowing one small cave to be visited twice. The ways on
+    from a cave only depend on which small caves have been visited and
+    whether one has been twice, so each of those is counted once however
+    many paths lead to it.
+    """
+    memo: Memo = {}
+    return ways_on(start, 0, True, memo), ways_on(start, 0, False, memo)
+
+
+def extend_route(route: list[Cave], visited: int,
+                 visited_twice: bool) -> Iterator[tuple[str, ...]]:
+    cave = route[-1]
+    if cave.isend:
+        yield tuple(route_cave.name for route_cave in route)
+        return
+    visited |= cave.bit
+    for next_cave in cave.connects:
+        next_visited_twice = visited_twice
+        if next_cave.bit & visited:
+            if visited_twice:
+                continue
+            next_visited_twice = True
+        route.append(next_cave)
+        yield from extend_route(route, visited, next_visited_twice)
+        route.pop()
+
+
+def paths(start: Cave, allow_small_twice: bool = True) -> Iterator[tuple[str, ...]]:
+    """Every path from start to end as its caves' names, one at a time"""
+    return extend_route([start], 0, not allow_small_twice)
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
     graph = graph_from_input(input_file)
-    complete_paths = extend_path_to_end(Path(Cave.from_name('start', graph),
-                                        frozenset()))
-
-    return (len([p for p in complete_paths if not p.has_visited_small_twice]),
-            len(complete_paths))
+    return count_paths(graph['start'])
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
@@ -5,90 +5,127 @@ Advent Of Code 2021 Day 13
 
 from __future__ import annotations
 
+import re
 import sys
-import time
-import collections
+import array
 
-FoldType = tuple[str, int]
-
-
-class Grid:
-    def __init__(self) -> None:
-        self.size = [0, 0]
-        self.rows: dict[int, set[int]] = collections.defaultdict(set)
-        self.cols: dict[int, set[int]] = collections.defaultdict(set)
-
-    def add_dot(self, x: int, y: int) -> None:
-        self.rows[y].add(x)
-        self.cols[x].add(y)
-        self.size = [max(self.size[0], x + 1), max(self.size[1], y + 1)]
-
-    def fold(self, dimension: str, val: int) -> None:
-        is_fold_up = dimension == 'y'
-        if is_fold_up:
-            size_index = 1
-            merging, update = self.rows, self.cols
-        else:
-            size_index = 0
-            merging, update = self.cols, self.rows
-
-        for fold_line, into_line in zip(range(val + 1, self.size[size_index]),
-                                        range(val - 1, -1, -1)):
-            for new_dot in merging[fold_line] - merging[into_line]:
-                merging[into_line].add(new_dot)
-                update[new_dot].add(into_line)
-        self.size[size_index] = val
-
-    def num_dots(self) -> int:
-        num_dots = 0
-        for row_y, row in self.rows.items():
-            if row_y < self.size[1]:
-                num_dots += sum(1 for d in row if d < self.size[0])
-        return num_dots
-
-    def __str__(self) -> str:
-        lines = [''.join(['#' if x in self.rows.get(y, set()) else '.'
-                          for x in range(0, self.size[0])])
-                 for y in range(0, self.size[1])]
-        return "\n".join(lines)
-
-
-def parse_input(input_file: str) -> tuple[Grid, list[FoldType]]:
-    folds = []
-    grid = Grid()
-    with open(input_file) as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                x, y = line.split(',')
-                grid.add_dot(int(x), int(y))
-            else:
-                # Blank line separates the dot section from the fold section
-                break
-        for line in f:
-            _, _, fold_line = line.strip().split(' ')
-            dimension, value = fold_line.split('=')
-            folds.append((dimension, int(value)))
-    return (grid, folds)
+from typing import Sequence
 
+import aoc
+import grid
 
-def p1p2(input_file: str) -> tuple[int, str]:
-    grid, folds = parse_input(input_file)
-
-    grid.fold(folds[0][0], folds[0][1])
-    part_1 = grid.num_dots()
-    for fold_dimension, fold_value in folds[1:]:
-        grid.fold(fold_dimension, fold_value)
+FoldType = tuple[str, int]
 
-    return (part_1, str(grid))
+# Characters of input parsed at a time
+CHUNK_LINES_HINT = 1 << 20
+
+number_re = re.compile(r"[0-9]+")
+fold_re = re.compile(r"fold along ([xy])=([0-9]+)")
+
+# The letters the code is drawn in, each 4 dots wide and 6 high with a
+# column of space after it
+GLYPH_WIDTH = 4
+GLYPH_HEIGHT = 6
+FONT = {
+    'A': ('.##.', '#..#', '#..#', '####', '#..#', '#..#'),
+    'B': ('###.', '#..#', '###.', '#..#', '#..#', '###.'),
+    'C': ('.##.', '#..#', '#...', '#...', '#..#', '.##.'),
+    'E': ('####', '#...', '###.', '#...', '#...', '####'),
+    'F': ('####', '#...', '###.', '#...', '#...', '#...'),
+    'G': ('.##.', '#..#', '#...', '#.##', '#..#', '.###'),
+    'H': ('#..#', '#..#', '####', '#..#', '#..#', '#..#'),
+    'J': ('..##', '...#', '...#', '...#', '#..#', '.##.'),
+    'K': ('#..#', '#.#.', '##..', '#.#.', '#.#.', '#..#'),
+    'L': ('#...', '#...', '#...', '#...', '#...', '####'),
+    'O': ('.##.', '#..#', '#..#', '#..#', '#..#', '.##.'),
+    'P': ('###.', '#..#', '#..#', '###.', '#...', '#...'),
+    'R': ('###.', '#..#', '#..#', '###.', '#.#.', '#..#'),
+    'S': ('.###', '#...', '#...', '.##.', '...#', '###.'),
+    'U': ('#..#', '#..#', '#..#', '#..#', '#..#', '.##.'),
+    'Z': ('####', '...#', '..#.', '.#..', '#...', '####'),
+}
+glyph_letters: dict[tuple[str, ...], str] = {glyph: letter for letter, glyph in FONT.items()}
+
+
+def parse_input(input_file: aoc.InputType) -> tuple[array.array[int], array.array[int],
+                                                      list[FoldType]]:
+    """The dots' x and y coordinates and the folds"""
+    xs = array.array('q')
+    ys = array.array('q')
+    folds: list[FoldType] = []
+    in_folds = False
+    with aoc.open_input(input_file) as f:
+        while lines := f.readlines(CHUNK_LINES_HINT):
+            text = ''.join(lines)
+            if not in_folds:
+                # Blank line separates the dot section from the fold section
+                if text.startswith('\n'):
+                    dots_text, text, in_folds = '', text[1:], True
+                else:
+                    dots_text, separator, text = text.partition('\n\n')
+                    in_folds = bool(separator)
+                coords = array.array('q', map(int, number_re.findall(dots_text)))
+                xs.extend(coords[0::2])
+                ys.extend(coords[1::2])
+            folds.extend((dimension, int(value)) for dimension, value in fold_re.findall(text))
+    return xs, ys, folds
+
+
+def fold_map(size: int, fold_lines: Sequence[int]) -> tuple[list[int], int]:
+    """
+    Where each position from 0 up to size along one axis ends up after all
+    the folds along it (-1 for those on a fold line or folded off the edge of
+    the paper) and the size left. Folding one axis doesn't move anything along
+    the other so the whole sequence can be worked out once for every
+    position, rather than for every dot, working back from the last fold.
+    """
+    sizes = [size, *fold_lines]
+    final_size = sizes[-1]
+    where = list(range(final_size))
+    for fold_line, size_before in zip(reversed(fold_lines), reversed(sizes[:-1])):
+        # where maps positions after this fold, those before the line stay
+        # put and those after it reflect back over it
+        reflected = where[::-1][:max(0, size_before - fold_line - 1)]
+        where = where + [-1] + reflected + [-1] * max(0, size_before - 2 * fold_line - 1)
+        where = where[:size_before]
+    return where, final_size
+
+
+def fold(xs: array.array[int], ys: array.array[int],
+         folds: Sequence[FoldType]) -> tuple[set[int], int, int]:
+    """The dots left after the folds as y * width + x, and the paper's width and height"""
+    x_map, width = fold_map(max(xs) + 1, [line for dimension, line in folds if dimension == 'x'])
+    y_map, height = fold_map(max(ys) + 1, [line for dimension, line in folds if dimension == 'y'])
+    return ({y * width + x for x, y in zip(map(x_map.__getitem__, xs), map(y_map.__getitem__, ys))
+             if x >= 0 and y >= 0},
+            width, height)
+
+
+def read_code(dots: set[int], width: int, height: int) -> str:
+    """The letters drawn by the dots, or the dots drawn out if they aren't all letters"""
+    bit_grid = grid.BitGrid(width, height)
+    drawing = bit_grid.render(sum(1 << dot for dot in dots))
+    if height != GLYPH_HEIGHT:
+        return drawing
+    rows = drawing.split('\n')
+    letters = [glyph_letters.get(tuple(row[x:x + GLYPH_WIDTH] for row in rows))
+               for x in range(0, width, GLYPH_WIDTH + 1)]
+    if not all(letters):
+        return drawing
+    return ''.join(letter for letter in letters if letter)
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, str]:
+    xs, ys, folds = parse_input(input_file)
+
+    part_1 = len(fold(xs, ys, folds[:1])[0])
+    dots, width, height = fold(xs, ys, folds)
+
+    return (part_1, read_code(dots, width, height))
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
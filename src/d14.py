@@ -6,73 +6,112 @@ Advent Of Code 2021 Day 14
 from __future__ import annotations
 
 import sys
-import time
-import dataclasses
-import collections
-
-
-@dataclasses.dataclass
-class PatternNode:
-    pattern: str
-    path_visits: int = 0
-    paths: int = 0
-    new_paths: int = 0
-    connects: list[PatternNode] = dataclasses.field(default_factory=list)
-
-    def __hash__(self) -> int:
-        return hash(self.pattern)
-
-    def score(self) -> dict[str, int]:
-        score: dict[str, int] = collections.defaultdict(int)
-        # paths is the number of times this pattern appears in the final string
-        # so each char in this pattern gets that score
-        for char in self.pattern:
-            score[char] += self.paths
-        # Every time this pattern has been "passed through" the middle chars
-        # will have been double counted so remove those from the score
-        for char in self.pattern[1:-1]:
-            score[char] -= self.path_visits
-        return score
-
-    @classmethod
-    def from_pattern(cls, pattern: str,
-                     graph: dict[str, PatternNode]) -> PatternNode:
-        if pattern not in graph:
-            graph[pattern] = cls(pattern)
-        return graph[pattern]
-
-
-class PolymerGraph:
-    def __init__(self, head_pattern: str,
-                 polymer_mapping: dict[str, str]) -> None:
-        self.head_pattern = head_pattern
-        self.polymer_mapping = polymer_mapping
-        self.graph: dict[str, PatternNode] = {}
-
-    def construct(self) -> PatternNode:
-        head_node = PatternNode.from_pattern(self.head_pattern, self.graph)
-        nodes_to_walk = {head_node}
-        while nodes_to_walk:
-            node = nodes_to_walk.pop()
-            # Loop through each character pair in this pattern and add a
-            # connection to the resulting string
-            for pair_num in range(len(node.pattern) - 1):
-                connect_pattern = self.polymer_mapping[
-                    node.pattern[pair_num:pair_num + 2]]
-                connect_node = PatternNode.from_pattern(connect_pattern,
-                                                        self.graph)
-                node.connects.append(connect_node)
-                if not connect_node.connects:
-                    # Hasn't been walked yet so add it to the set to do so
-                    nodes_to_walk.add(connect_node)
-        return head_node
-
-    def score(self) -> dict[str, int]:
-        score: dict[str, int] = collections.defaultdict(int)
-        for node in self.graph.values():
-            score.update((char, score[char] + val)
-                         for char, val in node.score().items())
-        return score
+
+from typing import Iterable, Optional
+
+import aoc
+import matrix
+
+
+Counts = tuple[int, ...]
+
+
+class Polymer:
+    """
+    The polymer is only ever needed as how many of each pair of adjacent
+    elements it has, each step every pair with a rule becomes the two pairs
+    either side of the inserted element. The pairs it can ever have are
+    found from the template so the counts are a vector over just those.
+    """
+    def __init__(self, template: str, rules: dict[str, str]) -> None:
+        self.template = template
+        template_pairs = [template[idx:idx + 2] for idx in range(len(template) - 1)]
+        self.pairs: list[str] = []
+        self.pair_index: dict[str, int] = {}
+        to_index = list(dict.fromkeys(template_pairs))
+        while to_index:
+            pair = to_index.pop()
+            if pair not in self.pair_index:
+                self.pair_index[pair] = len(self.pairs)
+                self.pairs.append(pair)
+                if pair in rules:
+                    to_index.extend((pair[0] + rules[pair], rules[pair] + pair[1]))
+        # The pairs each pair becomes in a step, a pair without a rule stays
+        self.successors = [tuple(self.pair_index[successor] for successor in
+                                 ((pair[0] + rules[pair], rules[pair] + pair[1])
+                                  if pair in rules else (pair,)))
+                           for pair in self.pairs]
+        self.counts = self.counts_of(template_pairs)
+        # one_step() ** (2 ** i) at index i, kept per modulus
+        self._powers: matrix.Powers = {}
+
+    def counts_of(self, pairs: Iterable[str]) -> Counts:
+        counts = [0] * len(self.pairs)
+        for pair in pairs:
+            counts[self.pair_index[pair]] += 1
+        return tuple(counts)
+
+    def one_step(self) -> matrix.Matrix:
+        """Row i gives how many of pair i come from each pair a step before"""
+        rows = [[0] * len(self.pairs) for _ in self.pairs]
+        for idx, successors in enumerate(self.successors):
+            for successor in successors:
+                rows[successor][idx] += 1
+        return tuple(tuple(row) for row in rows)
+
+    def step(self, counts: Counts, modulus: Optional[int]) -> Counts:
+        new_counts = [0] * len(counts)
+        for count, successors in zip(counts, self.successors):
+            if count:
+                for successor in successors:
+                    new_counts[successor] += count
+        if modulus is None:
+            return tuple(new_counts)
+        return tuple(count % modulus for count in new_counts)
+
+    def advance(self, counts: Counts, steps: int, modulus: Optional[int] = None) -> Counts:
+        """
+        The counts steps later. A step on its own only touches each pair's
+        successors whereas squaring the matrix is a cube of the number of
+        pairs, so only go by the matrix powers for many steps.
+        """
+        if steps < len(self.pairs) ** 2:
+            for _ in range(steps):
+                counts = self.step(counts, modulus)
+            return counts
+        return matrix.advance(self.one_step(), self._powers, counts, steps, modulus)
+
+    def element_counts(self, counts: Counts, modulus: Optional[int] = None) -> dict[str, int]:
+        """How many of each element there are in a polymer with the pair counts"""
+        # Every element starts a pair apart from the last, which never changes
+        element_counts = {self.template[-1]: 1}
+        for pair, count in zip(self.pairs, counts):
+            if count:
+                element_counts[pair[0]] = element_counts.get(pair[0], 0) + count
+        if modulus is None:
+            return element_counts
+        return {element: count % modulus for element, count in element_counts.items()}
+
+    def element_counts_after(self, horizons: Iterable[int],
+                             modulus: Optional[int] = None) -> list[dict[str, int]]:
+        """
+        The element counts after each number of steps in horizons (modulo
+        modulus if given, the polymer nearly doubles in length every step so
+        without one the counts for a huge number of steps are huge numbers).
+        The horizons are answered in order of steps, each advancing from the
+        one before.
+        """
+        horizons = list(horizons)
+        if any(horizon < 0 for horizon in horizons):
+            raise ValueError("Can only step forward")
+        results: list[dict[str, int]] = [{} for _ in horizons]
+        counts = self.counts
+        step_num = 0
+        for idx in sorted(range(len(horizons)), key=horizons.__getitem__):
+            counts = self.advance(counts, horizons[idx] - step_num, modulus)
+            step_num = horizons[idx]
+            results[idx] = self.element_counts(counts, modulus)
+        return results
 
 
 def char_count_to_score(counter: dict[str, int]) -> int:
@@ -80,43 +119,24 @@ def char_count_to_score(counter: dict[str, int]) -> int:
     return counter_sorted[-1] - counter_sorted[0]
 
 
-def p1p2(input_file: str) -> tuple[int, int]:
-    polymer_mapping = {}
-    with open(input_file) as f:
+def read_polymer(input_file: aoc.InputType) -> Polymer:
+    rules = {}
+    with aoc.open_input(input_file) as f:
         polymer_template = next(f).strip()
         next(f)
         for line in f:
             pair, inserted_char = line.strip().split(' -> ')
-            polymer_mapping[pair] = pair[0] + inserted_char + pair[1]
-
-    graph = PolymerGraph(polymer_template, polymer_mapping)
-    head = graph.construct()
-
-    # Add the lonely single path to start
-    head.paths += 1
-    for step in range(40):
-        for from_node in (n for n in graph.graph.values() if n.paths):
-            # Some paths at this node waiting to finish
-            # move them all on one step
-            from_node.path_visits += from_node.paths
-            for to_node in from_node.connects:
-                to_node.new_paths += from_node.paths
-        # Flip over to the new path counts for this step
-        for node in graph.graph.values():
-            node.paths = node.new_paths
-            node.new_paths = 0
-        if step == 9:
-            p1_score = char_count_to_score(graph.score())
-
-    return (p1_score, char_count_to_score(graph.score()))
+            rules[pair] = inserted_char
+    return Polymer(polymer_template, rules)
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    p1_counts, p2_counts = read_polymer(input_file).element_counts_after((10, 40))
+    return (char_count_to_score(p1_counts), char_count_to_score(p2_counts))
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
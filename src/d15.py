@@ -6,82 +6,90 @@ Advent Of Code 2021 Day 15
 from __future__ import annotations
 
 import sys
-import time
-import heapq
-import collections
-
-from typing import Iterable
-
-
-Point = collections.namedtuple('Point', ['x', 'y'])
-
-
-def neighbours(point: Point, size: Point) -> Iterable[Point]:
-    for x_delta, y_delta in ((-1, 0), (0, 1), (1, 0), (0, -1)):
-        new_x, new_y = point.x + x_delta, point.y + y_delta
-        if 0 <= new_x < size.x and 0 <= new_y < size.y:
-            yield Point(new_x, new_y)
-
-
-def lowest_risk_get(rows: list[list[int]], size: Point) -> int:
-    start = Point(0, 0)
-    dest = Point(size.x - 1, size.y - 1)
-
-    reachable_heapq: list[tuple[int, Point]] = []
-    heapq.heappush(reachable_heapq, (0, start))
-    lowest_risk_known: set[Point] = set([start])
-    while reachable_heapq:
-        risk, low_risk_point = heapq.heappop(reachable_heapq)
-        if low_risk_point == dest:
-            lowest_risk_to_dest = risk
-            break
-        for point in neighbours(low_risk_point, size):
-            if point not in lowest_risk_known:
-                # The first time we can reach a point will be the lowest risk
-                # route to that point since all routes into a point incur the
-                # same risk (not true of general path finding in graphs)
-                # - ty to Jackson for pointing this out.
-                lowest_risk_known.add(point)
-                heapq.heappush(reachable_heapq,
-                               (risk + rows[point.y][point.x], point))
-
-    return lowest_risk_to_dest
-
-
-def p1p2(input_file: str) -> tuple[int, int]:
-    p1_rows, p2_rows = [], []
-    with open(input_file) as f:
-        for line in f:
-            p1_rows.append([int(char) for char in line.strip()])
-
-    p1_size = Point(len(p1_rows[0]), len(p1_rows))
-    p2_size = Point(p1_size.x * 5, p1_size.y * 5)
-    # Extend across
-    for row in p1_rows:
-        new_row = row * 5
-        for x in range(p1_size.x):
-            for repeat in range(1, 5):
-                index = x + (repeat * p1_size.x)
-                new_row[index] = ((row[x] + repeat - 1) % 9) + 1
-        p2_rows.append(new_row)
-    # Now extend down
-    for repeat in range(1, 5):
-        for y in range(p1_size.y):
-            new_row = p2_rows[y][:]
-            for x in range(p2_size.x):
-                new_row[x] = ((p2_rows[y][x] + repeat - 1) % 9) + 1
-            p2_rows.append(new_row)
-
-    return (lowest_risk_get(p1_rows, p1_size),
-            lowest_risk_get(p2_rows, p2_size))
+import itertools
+
+from typing import Sequence
+
+import aoc
+import input_cache
+
+
+MAX_RISK = 9
+
+
+@input_cache.cached_parser(version=1)
+def read_risk_levels(input_file: aoc.InputType) -> tuple[tuple[int, ...], ...]:
+    with aoc.open_input(input_file) as f:
+        return tuple(tuple(int(char) for char in line.strip()) for line in f)
+
+
+def lowest_risk(risk_levels: Sequence[Sequence[int]], tiles: int = 1) -> int:
+    """
+    The lowest total risk from the top left to the bottom right of the map
+    made of tiles x tiles copies of the cave, each tile's risk one more than
+    the tile above or to the left, wrapping from 9 back to 1. The map is
+    never built, a point's risk is read from the one of 9 wrapped copies of
+    the cave its tile uses and the points reached are kept a bit each.
+    """
+    height, width = len(risk_levels), len(risk_levels[0])
+    # The cave's rows with every shift of their risks a tile can have
+    wrapped_rows = [[bytes((risk + shift - 1) % MAX_RISK + 1 for risk in row)
+                     for row in risk_levels] for shift in range(MAX_RISK)]
+
+    # Points are indexed row major with a border of padding so stepping off
+    # the map needs no bounds check. The padding is marked as already reached
+    # so it's never entered. Where each row and column (counting the padding)
+    # is in the cave and which tile it's in:
+    full_height, full_width = height * tiles, width * tiles
+    stride = full_width + 2
+    cave_rows = [0] + [row % height for row in range(full_height)] + [0]
+    tile_rows = [0] + [row // height for row in range(full_height)] + [0]
+    cave_cols = [0] + [col % width for col in range(full_width)] + [0]
+    tile_cols = [0] + [col // width for col in range(full_width)] + [0]
+    num_points = stride * (full_height + 2)
+    reached = bytearray((num_points + 7) >> 3)
+    for idx in itertools.chain(range(stride), range(num_points - stride, num_points),
+                               range(stride, num_points - stride, stride),
+                               range(2 * stride - 1, num_points - stride, stride)):
+        reached[idx >> 3] |= 1 << (idx & 7)
+    start = stride + 1
+    dest = full_height * stride + full_width
+
+    # Dial's algorithm - a step costs at most MAX_RISK so only the buckets for
+    # the risk being visited and the next MAX_RISK risks can be in use
+    buckets: list[list[int]] = [[] for _ in range(MAX_RISK + 1)]
+    buckets[0].append(start)
+    reached[start >> 3] |= 1 << (start & 7)
+    risk = 0
+    while True:
+        bucket = buckets[risk % (MAX_RISK + 1)]
+        while bucket:
+            idx = bucket.pop()
+            if idx == dest:
+                return risk
+            row, col = divmod(idx, stride)
+            for next_idx, next_row, next_col in ((idx - stride, row - 1, col),
+                                                 (idx - 1, row, col - 1),
+                                                 (idx + 1, row, col + 1),
+                                                 (idx + stride, row + 1, col)):
+                if not reached[next_idx >> 3] >> (next_idx & 7) & 1:
+                    # The first time we can reach a point will be the lowest
+                    # risk route to that point since all routes into a point
+                    # incur the same risk
+                    reached[next_idx >> 3] |= 1 << (next_idx & 7)
+                    shift = (tile_rows[next_row] + tile_cols[next_col]) % MAX_RISK
+                    next_risk = risk + wrapped_rows[shift][cave_rows[next_row]][cave_cols[next_col]]
+                    buckets[next_risk % (MAX_RISK + 1)].append(next_idx)
+        risk += 1
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    risk_levels = read_risk_levels(input_file)
+    return (lowest_risk(risk_levels), lowest_risk(risk_levels, tiles=5))
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
@@ -5,16 +5,21 @@ Advent Of Code 2021 Day 16
 
 import sys
 import math
-import time
-import dataclasses
-from typing import Callable, ClassVar
 
+from typing import Callable, ClassVar, TextIO
+
+import aoc
+
+
+# Hex digits read from the input at a time
+HEX_CHUNK_SIZE = 16
 
-@dataclasses.dataclass
-class Packet:
-    binary_string: str
-    read_posn: int = 0
 
+class Packet:
+    """
+    The bits of one transmission (a line of hex digits) read from the input a
+    few hex digits at a time, so the whole transmission is never in memory
+    """
     type_map: ClassVar[dict[int, Callable[[list[int]], int]]] = {
         0: sum,
         1: math.prod,
@@ -26,13 +31,39 @@ class Packet:
         7: lambda pak_vals: 1 if pak_vals[0] == pak_vals[1] else 0,
     }
 
-    def read_str(self, len: int) -> str:
-        result = self.binary_string[self.read_posn:self.read_posn + len]
-        self.read_posn += len
+    def __init__(self, f: TextIO) -> None:
+        self.f = f
+        self.read_posn = 0
+        self.line_ended = False
+        # Bits read from the input but not yet from the packet
+        self.bits = 0
+        self.num_bits = 0
+
+    def fill(self, length: int) -> bool:
+        """Read enough from the input for length more bits, False if it ends first"""
+        while self.num_bits < length and not self.line_ended:
+            hex_string = self.f.readline(HEX_CHUNK_SIZE)
+            if hex_string.endswith('\n') or len(hex_string) < HEX_CHUNK_SIZE:
+                # The end of the line or the whole input
+                self.line_ended = True
+                hex_string = hex_string.rstrip()
+            if hex_string:
+                self.bits = (self.bits << (4 * len(hex_string))) | int(hex_string, 16)
+                self.num_bits += 4 * len(hex_string)
+        return self.num_bits >= length
+
+    def read_int(self, length: int) -> int:
+        if not self.fill(length):
+            raise ValueError(f"Transmission ended at bit {self.read_posn + self.num_bits}")
+        self.num_bits -= length
+        self.read_posn += length
+        result = self.bits >> self.num_bits
+        self.bits &= (1 << self.num_bits) - 1
         return result
 
-    def read_int(self, len: int) -> int:
-        return int(self.read_str(len), 2)
+    def skip_padding(self) -> None:
+        if not self.line_ended:
+            self.f.readline()
 
 
 def get_packet_info(p: Packet) -> tuple[int, int]:
@@ -40,22 +71,21 @@ def get_packet_info(p: Packet) -> tuple[int, int]:
     pak_type = p.read_int(3)
     if pak_type == 4:
         # Literal number
-        num_bin_string = ""
+        num = 0
         last = False
         while not last:
-            num_group = p.read_str(5)
-            num_bin_string += num_group[1:]
-            last = num_group[0] == "0"
-        values = [int(num_bin_string, 2)]
+            last = p.read_int(1) == 0
+            num = (num << 4) | p.read_int(4)
+        values = [num]
     else:
         # Subpackets
         length_type_id = p.read_int(1)
         values = []
         if length_type_id == 0:
             len_sub_packets = p.read_int(15)
-            sub_packets = Packet(p.read_str(len_sub_packets))
-            while sub_packets.read_posn < len_sub_packets:
-                subpack_version, subpack_value = get_packet_info(sub_packets)
+            sub_packets_end = p.read_posn + len_sub_packets
+            while p.read_posn < sub_packets_end:
+                subpack_version, subpack_value = get_packet_info(p)
                 version += subpack_version
                 values.append(subpack_value)
         else:
@@ -68,26 +98,23 @@ def get_packet_info(p: Packet) -> tuple[int, int]:
     return (version, Packet.type_map[pak_type](values))
 
 
-def p1p2(input_file: str) -> tuple[list[int], list[int]]:
+def p1p2(input_file: aoc.InputType) -> tuple[list[int], list[int]]:
     version_sums: list[int] = []
     values: list[int] = []
-    with open(input_file) as f:
-        for line in f:
-            hex_string = line.strip()
-            bin_string = "".join([f"{int(char, 16):04b}"
-                                  for char in hex_string])
-            version_sum, value = get_packet_info(Packet(bin_string))
+    with aoc.open_input(input_file) as f:
+        while True:
+            packet = Packet(f)
+            if not packet.fill(1):
+                break
+            version_sum, value = get_packet_info(packet)
+            packet.skip_padding()
             version_sums.append(version_sum)
             values.append(value)
     return (version_sums, values)
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
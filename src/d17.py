@@ -5,11 +5,12 @@ Advent Of Code 2021 Day 17
 
 import sys
 import math
-import time
 import dataclasses
 
 from typing import NamedTuple, Iterable
 
+import aoc
+
 
 class Point(NamedTuple):
     x: int
@@ -46,8 +47,8 @@ def hits_target(velocity: Point, target: Area, max_steps: int) -> bool:
     return False
 
 
-def p1p2(input_file: str) -> tuple[int, int]:
-    with open(input_file) as f:
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    with aoc.open_input(input_file) as f:
         xs_str, ys_str = next(f)[len("target area: "):].strip().split(', ')
         xs = tuple(int(val) for val in xs_str[2:].split('..')[:2])
         ys = tuple(int(val) for val in ys_str[2:].split('..')[:2])
@@ -72,10 +73,7 @@ def p1p2(input_file: str) -> tuple[int, int]:
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    print(f"Elapsed: {time.perf_counter() - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
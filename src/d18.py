@@ -5,11 +5,12 @@ Advent Of Code 2021 Day 18
 from __future__ import annotations
 
 import sys
-import time
 import dataclasses
 
 from typing import Union, Any, Optional, Iterable
 
+import aoc
+
 
 @dataclasses.dataclass
 class SnailfishNumber:
@@ -24,10 +25,9 @@ class SnailfishNumber:
             self.r.parent = self
 
     def reduce(self) -> None:
-        reduce = True
-        while reduce:
-            if not self.explode():
-                reduce = self.split()
+        # Split only once there's nothing left to explode
+        while self.explode() or self.split():
+            pass
 
     def explode(self) -> bool:
         child_to_explode = next(self.get_too_deep(), None)  # type: ignore
@@ -158,8 +158,8 @@ class SnailfishNumber:
         return SnailfishNumber(None, *args)
 
 
-def p1p2(input_file: str) -> tuple[int, int]:
-    with open(input_file) as f:
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    with aoc.open_input(input_file) as f:
         number_lists = [eval(line.strip()) for line in f]
 
     snailfish_numbers = [SnailfishNumber.from_list(nl) for nl in number_lists]
@@ -180,10 +180,7 @@ def p1p2(input_file: str) -> tuple[int, int]:
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    print(f"Elapsed: {time.perf_counter() - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
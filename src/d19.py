@@ -7,7 +7,6 @@ from __future__ import annotations
 
 import sys
 import math
-import time
 import itertools
 import dataclasses
 import collections
@@ -15,6 +14,9 @@ import collections
 
 from typing import NamedTuple, Sequence
 
+import aoc
+import input_cache
+
 
 Matrix = Sequence[Sequence[int]]
 
@@ -88,17 +90,25 @@ class Scanner:
             self.mag_to_beacons[mag].add(beacon2)
 
 
-def p1p2(input_file: str) -> tuple[int, int]:
-    scanners: list[Scanner] = []
-    with open(input_file) as f:
+@input_cache.cached_parser(version=1)
+def read_scanner_reports(input_file: aoc.InputType) -> tuple[tuple[int, tuple[tuple[int, int, int], ...]], ...]:
+    reports: list[tuple[int, list[tuple[int, int, int]]]] = []
+    with aoc.open_input(input_file) as f:
         for line in f:
             if line.startswith('---'):
                 scanner_id = line.strip().removeprefix('--- scanner ').removesuffix(' ---')
-                scanners.append(Scanner(int(scanner_id)))
+                reports.append((int(scanner_id), []))
             else:
                 line = line.strip()
                 if line:
-                    scanners[-1].beacons.append(Coord(*[int(c) for c in line.split(',')]))
+                    x, y, z = [int(c) for c in line.split(',')]
+                    reports[-1][1].append((x, y, z))
+    return tuple((scanner_id, tuple(beacons)) for scanner_id, beacons in reports)
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    scanners = [Scanner(scanner_id, [Coord(*beacon) for beacon in beacons])
+                for scanner_id, beacons in read_scanner_reports(input_file)]
 
     scanners_by_id = {scanner.id: scanner for scanner in scanners}
     for scanner in scanners:
@@ -161,10 +171,7 @@ def p1p2(input_file: str) -> tuple[int, int]:
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    print(f"Elapsed: {time.perf_counter() - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
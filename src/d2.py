@@ -4,35 +4,56 @@ Advent Of Code 2021 Day 2
 """
 
 import sys
-import time
+import functools
 
+from typing import Iterable
 
-def p1p2(input_file: str) -> tuple[int, int]:
+import aoc
+
+
+# The (horiz, depth, aim) a run of commands ends at when it starts from zero.
+# Every command is an affine update of that state so the course of a whole
+# file is the courses of its chunks followed one after another.
+Course = tuple[int, int, int]
+
+
+def course_of(lines: Iterable[str]) -> Course:
     horiz: int = 0
     depth: int = 0
     aim: int = 0
-
-    with open(input_file) as f:
-        for line in f:
-            action, value_str = line.split()
-            value = int(value_str)
-            if action == 'forward':
-                horiz += value
-                depth += aim * value
-            elif action == 'up':
-                aim -= value
-            elif action == 'down':
-                aim += value
+    for line in lines:
+        action, value_str = line.split()
+        value = int(value_str)
+        if action == 'forward':
+            horiz += value
+            depth += aim * value
+        elif action == 'up':
+            aim -= value
+        elif action == 'down':
+            aim += value
+    return (horiz, depth, aim)
+
+
+def follow(first: Course, then: Course) -> Course:
+    """The course taking first and then then"""
+    first_horiz, first_depth, first_aim = first
+    then_horiz, then_depth, then_aim = then
+    # Every forward in then also goes deeper by the aim first ended with
+    return (first_horiz + then_horiz,
+            first_depth + then_depth + first_aim * then_horiz,
+            first_aim + then_aim)
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    horiz, depth, aim = aoc.map_reduce_line_chunks(
+        course_of, lambda courses: functools.reduce(follow, courses, (0, 0, 0)), input_file)
 
     print(f"{horiz=}, {depth=}, {aim=}")
     return (horiz * aim, horiz * depth)
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    print(f"Elapsed: {time.perf_counter() - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
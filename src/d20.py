@@ -4,77 +4,59 @@ Advent Of Code 2021 Day 20
 """
 
 import sys
-import time
 
+import aoc
+import grid
+import input_cache
 
-char_to_bit = {'.': '0', '#': '1'}
 
-
-def pixel_to_int(row: int, col: int, size: int, lines: list[str], default_char: str) -> int:
-    bit_string = ""
-    for vert_delta in (-1, 0, 1):
-        for horiz_delta in (-1, 0, 1):
-            new_row = row + vert_delta
-            new_col = col + horiz_delta
-            if (new_row >= 0 and new_col >= 0 and
-                new_row < size and new_col < size):
-                # get value from grid
-                bit_string += char_to_bit[lines[new_row][new_col]]
-            else:
-                # Default char
-                bit_string += char_to_bit[default_char]
-    return int(bit_string, 2)
-
-
-def enhance(image: list[str], ei_algo: str, default_char: str) -> list[str]:
-    enhanced = []
-    size = len(image[0])
-    for row_num in range(size):
-        new_row = ""
-        for char_num in range(size):
-            ei_algo_idx = pixel_to_int(row_num, char_num, size, image, default_char)
-            new_row += ei_algo[ei_algo_idx]
-        enhanced.append(new_row)
-    return enhanced
-
-
-def pad(image: list[str], char: str) -> list[str]:
-    width = len(image[0]) + 2
-    result = [char * width]
-    result.extend([char + line + char for line in image])
-    result.append(char * width)
-    return result
-
-
-def p1p2(input_file: str) -> tuple[int, int]:
-    with open(input_file) as f:
+@input_cache.cached_parser(version=1)
+def read_algo_and_image(input_file: aoc.InputType) -> tuple[str, tuple[str, ...]]:
+    with aoc.open_input(input_file) as f:
         ei_algo = next(f).strip()
         assert len(ei_algo) == 512
         next(f)  # Blank line
-        image = [line.strip() for line in f]
-
-    default_char = "."
+        return ei_algo, tuple(line.strip() for line in f)
+
+
+def enhance(image: grid.BitGrid, lit: int, ei_algo: str,
+            default_lit: bool) -> tuple[grid.BitGrid, int]:
+    # The image grows by one pixel on every side each step
+    image, lit = image.padded(lit, 1, fill=default_lit)
+    # Each pixel's 3x3 square, top left is the most significant bit of the
+    # index into the algorithm
+    square_bits = image.neighbours(lit, diagonals=True, fill=default_lit)
+    square_bits.insert(4, lit)
+
+    # Evaluate the algorithm for every pixel at once: start with a board per
+    # algorithm entry and merge pairs on each index bit, least significant
+    # first, until one board is left
+    all_lit = image.full
+    boards = [all_lit if char == '#' else 0 for char in ei_algo]
+    for bit_board in reversed(square_bits):
+        boards = [off ^ ((off ^ on) & bit_board) if off != on else off
+                  for off, on in zip(boards[0::2], boards[1::2])]
+    return image, boards[0]
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    ei_algo, input_image = read_algo_and_image(input_file)
+    image, lit = grid.BitGrid.from_lines(input_image, '#')
+
+    default_lit = False
     for step in range(50):
-        image = enhance(pad(image, default_char), ei_algo, default_char)
-        if default_char == '.':
-            if ei_algo[0] == '#':
-                # Now the infiite expanse will have flipped to '#'
-                default_char = '#'
-        else:
-            if ei_algo[-1] == '.':
-                # Now the infiite expanse will have flipped to '.'
-                default_char = '.'
+        image, lit = enhance(image, lit, ei_algo, default_lit)
+        # Every pixel of the infinite expanse has a square of all unlit or all
+        # lit pixels
+        default_lit = ei_algo[-1 if default_lit else 0] == '#'
         if step == 1:
-            p1_lit = sum(line.count('#') for line in image)
+            p1_lit = lit.bit_count()
 
-    return (p1_lit, sum(line.count('#') for line in image))
+    return (p1_lit, lit.bit_count())
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    print(f"Elapsed: {time.perf_counter() - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
@@ -5,12 +5,15 @@ Advent Of Code 2021 Day 21
 from __future__ import annotations
 
 import sys
-import time
+import itertools
 import collections
 import dataclasses
 
 from typing import NamedTuple, Iterable
 
+import aoc
+import input_cache
+
 
 def three_dice() -> Iterable[int]:
     for die_roll1 in (1, 2, 3):
@@ -28,9 +31,14 @@ class Play(NamedTuple):
         return Play(new_pos, self.score + new_pos)
 
 
-def p2(input_file: str) -> int:
-    with open(input_file) as f:
-        players = tuple([Play(int(line.strip().split()[-1])) for line in f])
+@input_cache.cached_parser(version=1)
+def read_start_positions(input_file: aoc.InputType) -> tuple[int, ...]:
+    with aoc.open_input(input_file) as f:
+        return tuple(int(line.strip().split()[-1]) for line in f)
+
+
+def p2(input_file: aoc.InputType) -> int:
+    players = tuple([Play(position) for position in read_start_positions(input_file)])
 
     game_state_counts = collections.defaultdict(int)
     game_state_counts[(players[0], players[1]), 0] = 1
@@ -63,27 +71,25 @@ class Player:
         self.score += self.position
 
 
-def p1(input_file: str) -> int:
-    with open(input_file) as f:
-        players = [Player(int(line.strip().split()[-1])) for line in f]
+def p1(input_file: aoc.InputType) -> int:
+    players = [Player(position) for position in read_start_positions(input_file)]
 
-    die = iter(range(1, 1001))
+    # The deterministic die goes 1 to 100 then starts again at 1
+    die = itertools.cycle(range(1, 101))
+    num_rolls = 0
     while all(player.score < 1000 for player in players):
         for player in players:
             player.with_roll(next(die) + next(die) + next(die))
+            num_rolls += 3
             if player.score >= 1000:
                 break
 
     loser_score = [player for player in players if player.score < 1000][0].score
-    return loser_score * (next(die) - 1)
+    return loser_score * num_rolls
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1(cli_args[0]))
-    print(p2(cli_args[0]))
-    print(f"Elapsed: {time.perf_counter() - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1, p2)
 
 
 if __name__ == "__main__":
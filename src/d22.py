@@ -6,11 +6,15 @@ from __future__ import annotations
 
 import sys
 import math
-import time
 import itertools
 
 from typing import NamedTuple
 
+import aoc
+import input_cache
+
+RebootStep = tuple[bool, tuple[tuple[int, int], ...]]
+
 
 class Range(NamedTuple):
     min: int
@@ -64,16 +68,23 @@ def get_number_points_on(volumes: list[tuple[bool, Volume]]) -> int:
     return on_count
 
 
-def p1p2(input_file: str) -> tuple[int, int]:
-    volumes: list[tuple[bool, Volume]] = []
-    with open(input_file) as f:
+@input_cache.cached_parser(version=1)
+def read_reboot_steps(input_file: aoc.InputType) -> tuple[RebootStep, ...]:
+    steps: list[RebootStep] = []
+    with aoc.open_input(input_file) as f:
         for line in f:
             action, coord_str = line.strip().split()
             dimention_ranges = []
             for dimention_str in coord_str.split(','):
-                dimention_ranges.append(Range(*tuple(
-                    int(val) for val in dimention_str[2:].split('..')[:2])))
-            volumes.append((action == "on", Volume(*dimention_ranges)))
+                low, high = dimention_str[2:].split('..')[:2]
+                dimention_ranges.append((int(low), int(high)))
+            steps.append((action == "on", tuple(dimention_ranges)))
+    return tuple(steps)
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    volumes = [(turn_on, Volume(*[Range(*d_range) for d_range in d_ranges]))
+               for turn_on, d_ranges in read_reboot_steps(input_file)]
 
     p1 = get_number_points_on([(turn_on, v) for turn_on, v in volumes if v.is_valid()])
     p2 = get_number_points_on(volumes)
@@ -81,10 +92,7 @@ def p1p2(input_file: str) -> tuple[int, int]:
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    print(f"Elapsed: {time.perf_counter() - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
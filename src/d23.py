@@ -5,13 +5,14 @@ Advent Of Code 2021 Day 23
 from __future__ import annotations
 
 import sys
-import time
 import heapq
 import functools
 import collections
 
 from typing import NamedTuple, Iterable
 
+import aoc
+
 
 distances = [  # hallway then room
     [3, 5, 7, 9],
@@ -133,8 +134,8 @@ def lowest_cost_solution(rooms: list[list[str]]) -> int:
     return result
 
 
-def p1p2(input_file: str) -> tuple[int, int]:
-    with open(input_file) as f:
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    with aoc.open_input(input_file) as f:
         rooms = []
         for line in f:
             amphipods = [char for char in line.strip() if char not in ('.', '#')]
@@ -149,10 +150,7 @@ def p1p2(input_file: str) -> tuple[int, int]:
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    print(f"Elapsed: {time.perf_counter() - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
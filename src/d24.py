@@ -4,10 +4,11 @@ Advent Of Code 2021 Day 24
 """
 
 import sys
-import time
 
 from typing import Optional
 
+import aoc
+
 
 x_adds = [12, 12, 15, -8, -4, 15, 14, 14, -13, -3, -7, 10, -6, -8]
 y_adds = [ 1,  1, 16,  5,  9,  3,  2, 15,   5, 11,  7,  1, 10,  3]
@@ -48,15 +49,12 @@ def find_valid_model(num_digits: int, smallest: bool = False,
     return res
 
 
-def p1p2(input_file: str) -> tuple[int, int]:
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
     return (int(find_valid_model(14)), int(find_valid_model(14, True)))  # type: ignore
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    print(f"Elapsed: {time.perf_counter() - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
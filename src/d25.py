@@ -4,84 +4,48 @@ Advent Of Code 2021 Day 25
 """
 
 import sys
-import time
-import dataclasses
 
+import aoc
+import grid
+import input_cache
 
-@dataclasses.dataclass
-class SeaCumcumber:
-    row: int
-    col: int
 
-    def can_move(self, grid: list[list[bool]], width: int, height: int) -> bool:
-        return False
+@input_cache.cached_parser(version=1)
+def read_seafloor(input_file: aoc.InputType) -> tuple[str, ...]:
+    with aoc.open_input(input_file) as f:
+        return tuple(line.strip() for line in f if line.strip())
 
-    def move(self, grid: list[list[bool]], width: int, height: int) -> None:
-        pass
 
+def move_herd(seafloor: grid.BitGrid, herd: int, other_herd: int,
+              d_row: int, d_col: int) -> tuple[int, bool]:
+    """Move every sea cucumber in herd that has an empty spot in front of it"""
+    empty = seafloor.full & ~(herd | other_herd)
+    # A sea cucumber can move if the spot in front is empty, i.e. it is where
+    # an empty spot ends up after moving it backwards one step
+    can_move = herd & seafloor.shift(empty, -d_row, -d_col, wrap=True)
+    if not can_move:
+        return herd, False
+    return (herd & ~can_move) | seafloor.shift(can_move, d_row, d_col, wrap=True), True
 
-class EastSC(SeaCumcumber):
-    def can_move(self, grid: list[list[bool]], width: int, _: int) -> bool:
-        return not grid[self.row][(self.col + 1) % width]
 
-    def move(self, grid: list[list[bool]], width: int, _: int) -> None:
-        grid[self.row][self.col] = False
-        self.col = (self.col + 1) % width
-        grid[self.row][self.col] = True
+def p1(input_file: aoc.InputType) -> int:
+    lines = read_seafloor(input_file)
+    seafloor, east_herd = grid.BitGrid.from_lines(lines, '>')
+    south_herd = seafloor.board_from_lines(lines, 'v')
 
-
-class SouthSC(SeaCumcumber):
-    def can_move(self, grid: list[list[bool]], _: int, height: int) -> bool:
-        return not grid[(self.row + 1) % height][self.col]
-
-    def move(self, grid: list[list[bool]], _: int, height: int) -> None:
-        grid[self.row][self.col] = False
-        self.row = (self.row + 1) % height
-        grid[self.row][self.col] = True
-
-
-def p1(input_file: str) -> int:
-    grid: list[list[bool]] = []
-    east_sc: list[SeaCumcumber] = []
-    south_sc: list[SeaCumcumber] = []
-    with open(input_file) as f:
-        for row_idx, line in enumerate(f):
-            row = []
-            for col_idx, char in enumerate(line.strip()):
-                if char == '.':
-                    row.append(False)
-                else:
-                    row.append(True)
-                    if char == '>':
-                        sc_list = east_sc
-                        sc_type = EastSC
-                    else:
-                        sc_list = south_sc
-                        sc_type = SouthSC  # type: ignore
-                    sc_list.append(sc_type(row_idx, col_idx))
-            if row:
-                grid.append(row)
-
-    width, height = len(grid[0]), len(grid)
     sc_moved = True
     generations = 0
     while sc_moved:
-        sc_moved = False
-        for sc_list in (east_sc, south_sc):
-            sc_can_move = [sc for sc in sc_list if sc.can_move(grid, width, height)]
-            sc_moved |= bool(sc_can_move)
-            for sc in sc_can_move:
-                sc.move(grid, width, height)
+        east_herd, east_moved = move_herd(seafloor, east_herd, south_herd, 0, 1)
+        south_herd, south_moved = move_herd(seafloor, south_herd, east_herd, 1, 0)
+        sc_moved = east_moved or south_moved
         generations += 1
 
     return generations
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1(cli_args[0]))
-    print(f"Elapsed: {time.perf_counter() - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1)
 
 
 if __name__ == "__main__":
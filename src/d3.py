@@ -3,77 +3,98 @@
 Advent Of Code 2021 Day 3
 """
 
+from __future__ import annotations
+
 import sys
-import time
-import collections
-from typing import Iterable, Optional
+import array
+import bisect
+
+from typing import Union
+
+import aoc
+import input_cache
+
+
+# Lines of the report parsed at a time
+CHUNK_LINES_HINT = 1 << 20
+# Widest line the values can be packed into an unsigned 64 bit array for
+ARRAY_MAX_BITS = 64
+
+# The number of bits per line, the number of lines with each bit (most
+# significant first) set and every line's value sorted. The values are packed
+# in an array unless they're too wide for one, then they're a list
+Values = Union['array.array[int]', list[int]]
+Report = tuple[int, tuple[int, ...], Values]
+
+
+@input_cache.cached_parser(version=3)
+def read_report(input_file: aoc.InputType) -> Report:
+    num_bits = 0
+    ones_counts: list[int] = []
+    values: Values = []
+    with aoc.open_input(input_file) as f:
+        while lines := [line.strip() for line in f.readlines(CHUNK_LINES_HINT)]:
+            if not ones_counts:
+                num_bits = len(lines[0])
+                ones_counts = [0] * num_bits
+                if num_bits <= ARRAY_MAX_BITS:
+                    values = array.array('Q')
+            for bit_i, column in enumerate(zip(*lines)):
+                ones_counts[bit_i] += column.count('1')
+            values.extend(int(line, 2) for line in lines)
+    if num_bits <= ARRAY_MAX_BITS:
+        return (num_bits, tuple(ones_counts), array.array('Q', sorted(values)))
+    return (num_bits, tuple(ones_counts), sorted(values))
+
+
+def find_rating(values: Values, num_bits: int, most_common: bool) -> int:
+    """
+    Filter values by their most (or least) common bit from the most
+    significant down until one is left. Being sorted the values left always
+    form a range and the split between those with a 0 and a 1 is found by
+    bisecting.
+    """
+    low, high = 0, len(values)
+    prefix = 0
+    for bit in reversed(range(num_bits)):
+        if high - low <= 1:
+            break
+        split = bisect.bisect_left(values, prefix | (1 << bit), low, high)
+        zeros, ones = split - low, high - split
+        # Ties go to 1 for the most common and 0 for the least common
+        keep_ones = ones >= zeros if most_common else ones < zeros
+        # Never filter down to nothing
+        if keep_ones and ones or not zeros:
+            low = split
+            prefix |= 1 << bit
+        else:
+            high = split
+    return int(values[low])
 
 
-def p2_find_val(bin_str_list: list[str], most_pop: bool) -> str:
-    for bit_i in range(1, len(bin_str_list[0])):
-        by_bit_value = partition_by_char(bin_str_list, bit_i)
-        if len(by_bit_value['0']) > len(by_bit_value['1']):
-            bin_str_list = by_bit_value['0'] if most_pop else by_bit_value['1']
-        else:
-            bin_str_list = by_bit_value['1'] if most_pop else by_bit_value['0']
-        if len(bin_str_list) == 1:
-            return bin_str_list[0]
-    assert False
-
-
-def partition_by_char(to_partition: Iterable[str], char_i: int) -> dict[str, list[str]]:
-    by_char = collections.defaultdict(list)
-    for string in to_partition:
-        by_char[string[char_i]].append(string.strip())
-    return by_char
-
-
-def p2(input_file: str) -> int:
-    # Split the input into lists depending on what the line starts with
-    # Sadly means loading the whole of the input into memory :(
-    with open(input_file) as f:
-        by_bit_value = partition_by_char(f, 0)
-
-    # Assign the lists to oxygen or co2 based on populatarity
-    if len(by_bit_value['0']) > len(by_bit_value['1']):
-        oxygen_nums = by_bit_value['0']
-        co2_nums = by_bit_value['1']
-    else:
-        oxygen_nums = by_bit_value['1']
-        co2_nums = by_bit_value['0']
-    
-    # From now on oxygen and co2 are independent
-    oxygen = int(p2_find_val(oxygen_nums, True), 2)
-    co2 = int(p2_find_val(co2_nums, False), 2)
+def p2(input_file: aoc.InputType) -> int:
+    num_bits, _, values = read_report(input_file)
+    oxygen = find_rating(values, num_bits, True)
+    co2 = find_rating(values, num_bits, False)
 
     print(f"{oxygen=} {co2=}")
     return oxygen * co2
 
 
-def p1(input_file: str) -> int:
-    counts: list[int] = []
-
-    with open(input_file) as f:
-        for line in f:
-            if not counts:
-                counts = [0] * len(line.strip())
-            for i, bit in enumerate(line.strip()):
-                counts[i] += 1 if int(bit) else -1
+def p1(input_file: aoc.InputType) -> int:
+    num_bits, ones_counts, values = read_report(input_file)
 
-    gamma = int(''.join(['1' if count > 0 else '0' for count in counts]), 2)
-    epsilon = int(''.join(['0' if count > 0 else '1' for count in counts]), 2)
+    gamma = 0
+    for ones in ones_counts:
+        gamma = (gamma << 1) | (ones > len(values) - ones)
+    epsilon = gamma ^ ((1 << num_bits) - 1)
 
     print(f"{gamma=} {epsilon=}")
     return gamma * epsilon
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1(cli_args[0]))
-    print(p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1, p2)
 
 
 if __name__ == "__main__":
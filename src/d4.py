@@ -3,95 +3,78 @@
 Advent Of Code 2021 Day 4
 """
 
-from __future__ import annotations
-
 import sys
-import time
-import collections
-
-
-class BingoBoard:
-    def __init__(self, rows: list[list[int]]) -> None:
-        self.size: int = len(rows)
-        self.unmarked_numbers: dict[int, list[tuple[int, int]]] = collections.defaultdict(list)
-        self.marked_rows: dict[int, int] = collections.defaultdict(int)
-        self.marked_cols: dict[int, int] = collections.defaultdict(int)
-        for row_i, row in enumerate(rows):
-            for col_i, number in enumerate(row):
-                # Assume it is possible for the same number to appear more than once
-                self.unmarked_numbers[number].append((row_i, col_i))
-
-    def mark_number(self, number: int) -> None:
-        for row_i, col_i in self.unmarked_numbers.pop(number, []):
-            self.marked_rows[row_i] += 1
-            self.marked_cols[col_i] += 1
-
-    def has_won(self) -> bool:
-        return (any(marked_count == self.size for marked_count in self.marked_rows.values()) or
-                any(marked_count == self.size for marked_count in self.marked_cols.values()))
-
-    def sum_unmarked_get(self) -> int:
-        return sum(number * len(indicies) for number, indicies in self.unmarked_numbers.items())
-
-    @classmethod
-    def from_lines(cls, lines: list[str]) -> BingoBoard:
-        rows = []
-        for line in lines:
-            rows.append([int(val) for val in line.strip().split()])
-        return cls(rows)
-
-
-def parse_calls_and_boards(input_file: str) -> tuple[list[int], list[BingoBoard]]:
-    bingo_boards: list[BingoBoard] = []
-
-    # Have to load the whole input file into memory :(
-    with open(input_file) as f:
-        calls = [int(val) for val in next(f).strip().split(',')]
-        board_lines = []
-        for line in f:
-            line = line.strip()
-            if line:
-                board_lines.append(line)
-            elif board_lines:
-                bingo_boards.append(BingoBoard.from_lines(board_lines))
-                board_lines = []
-    if board_lines:
-        bingo_boards.append(BingoBoard.from_lines(board_lines))
-    return calls, bingo_boards
 
+from typing import Iterator, Optional, TextIO
 
-def p1p2(input_file: str) -> tuple[int, int]:
-    part_1_res = 0
-    calls, bingo_boards = parse_calls_and_boards(input_file)
+import aoc
 
-    for call in calls:
-        for board in bingo_boards:
-            board.mark_number(call)
-        
-        winners = [b for b in bingo_boards if b.has_won()]
-        if winners:
-            if len(bingo_boards) == 1:
-                # Last winner
-                loser = winners[0]
-                break
-            elif not part_1_res:
-                part_1_res = winners[0].sum_unmarked_get() * call
+BoardRows = tuple[tuple[int, ...], ...]
 
-        # Get rid of the boards that have won
-        bingo_boards = [b for b in bingo_boards if not b.has_won()]
 
-    sum_unmarked = loser.sum_unmarked_get()
+def board_rows_from_lines(lines: list[str]) -> BoardRows:
+    return tuple(tuple(int(val) for val in line.strip().split())
+                 for line in lines)
 
-    print(f"{call=} {sum_unmarked=}")
-    return part_1_res, call * sum_unmarked
+
+def read_boards(f: TextIO) -> Iterator[BoardRows]:
+    """Each board in the rest of the input, one at a time"""
+    board_lines = []
+    for line in f:
+        line = line.strip()
+        if line:
+            board_lines.append(line)
+        elif board_lines:
+            yield board_rows_from_lines(board_lines)
+            board_lines = []
+    if board_lines:
+        yield board_rows_from_lines(board_lines)
+
+
+def score_board(rows: BoardRows, call_ranks: dict[int, int],
+                calls: tuple[int, ...]) -> Optional[tuple[int, int]]:
+    """The index of the call the board wins on and its score then, None if it never wins"""
+    never_called = len(calls)
+    rank_rows = [[call_ranks.get(number, never_called) for number in row] for row in rows]
+    # A row or column is complete once its last number is called and the
+    # board wins with the first of those
+    win_rank = min(min(max(line) for line in rank_rows),
+                   min(max(column) for column in zip(*rank_rows)))
+    if win_rank == never_called:
+        return None
+    sum_unmarked = sum(number for row, rank_row in zip(rows, rank_rows)
+                       for number, rank in zip(row, rank_row) if rank > win_rank)
+    return win_rank, calls[win_rank] * sum_unmarked
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    first_win: Optional[tuple[int, int]] = None
+    last_win: Optional[tuple[int, int]] = None
+
+    with aoc.open_input(input_file) as f:
+        calls = tuple(int(val) for val in next(f).strip().split(','))
+        call_ranks: dict[int, int] = {}
+        for rank, call in enumerate(calls):
+            # Only the first call of a number marks it
+            call_ranks.setdefault(call, rank)
+
+        for rows in read_boards(f):
+            win = score_board(rows, call_ranks, calls)
+            if win is None:
+                continue
+            # Of boards winning on the same call the first in the input counts
+            if first_win is None or win[0] < first_win[0]:
+                first_win = win
+            if last_win is None or win[0] > last_win[0]:
+                last_win = win
+
+    assert first_win is not None and last_win is not None
+    print(f"call={calls[last_win[0]]} score={last_win[1]}")
+    return first_win[1], last_win[1]
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
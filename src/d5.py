@@ -5,74 +5,247 @@ Advent Of Code 2021 Day 5
 
 from __future__ import annotations
 
+import re
 import sys
-import time
+import array
+import bisect
+import itertools
 import collections
 
-from typing import Iterator
-
-
-Point = collections.namedtuple('Point', ['x', 'y'])
-
-
-def point_from_str(point_str: str) -> Point:
-    return Point(int(point_str.split(',')[0]), int(point_str.split(',')[1]))
-
-
-class Line:
-    def __init__(self, start: Point, end: Point) -> None:
-        self.start = start
-        self.end = end
-        self.delta_x = self.end.x - self.start.x
-        self.delta_y = self.end.y - self.start.y
-        self.is_45 = (self.delta_x and self.delta_y and
-                      abs(self.delta_x) == abs(self.delta_y))
-
-    def points_between(self) -> Iterator[Point]:
-        if self.delta_x and self.delta_y and not self.is_45:
-            # Diagonal not 45
-            return
-
-        num_steps = max(abs(self.delta_x), abs(self.delta_y))
-        step_x = self.delta_x // num_steps
-        step_y = self.delta_y // num_steps
-        for i in range(num_steps + 1):
-            yield Point(self.start.x + step_x * i, self.start.y + step_y * i)
-
-    @classmethod
-    def from_str(cls, line_str: str) -> Line:
-        return cls(*[point_from_str(point_str)
-                     for point_str in line_str.split(' -> ')])
-
-
-def p1p2(input_file: str) -> tuple[int, int]:
-    grid: dict[tuple[int, int], collections.Counter[str]] = \
-                                   collections.defaultdict(collections.Counter)
-
-    with open(input_file) as f:
-        for line_str in f:
-            line = Line.from_str(line_str)
-            count = 'diag' if line.is_45 else 'h_and_v'
-            for point in Line.from_str(line_str).points_between():
-                grid[(point.x, point.y)].update({count: 1})
-
-    results: list[int] = [0, 0]
-    for counter in grid.values():
-        if counter['h_and_v'] >= 2:
-            results[0] += 1
-            results[1] += 1
-        elif (counter['h_and_v'] + counter['diag']) >= 2:
-            results[1] += 1
-
-    return (results[0], results[1])
+from typing import Iterator, NamedTuple
+
+import aoc
+
+
+# Most points to count the vents on a grid for (a byte each), beyond that the
+# overlaps are worked out from the lines without visiting points
+DENSE_MAX_POINTS = 1 << 25
+# A point's count on the grid only needs to go up to overlapped
+OVERLAPPED = 2
+ADD_ONE = bytes(min(count + 1, OVERLAPPED) for count in range(256))
+# Characters of input parsed at a time
+CHUNK_LINES_HINT = 1 << 20
+
+number_re = re.compile(r"-?[0-9]+")
+
+
+class Family(NamedTuple):
+    """
+    Lines in the same direction, along which x_coef * x + y_coef * y is
+    constant. Each line of the family is identified by that constant and the
+    points along it by their y (x for horizontal lines).
+    """
+    x_coef: int
+    y_coef: int
+
+    def line_id(self, x: int, y: int) -> int:
+        return self.x_coef * x + self.y_coef * y
+
+    def position(self, x: int, y: int) -> int:
+        return x if not self.x_coef else y
+
+    def point_at(self, line_id: int, position: int) -> tuple[int, int]:
+        if not self.x_coef:
+            return position, line_id
+        return line_id - self.y_coef * position, position
+
+
+HORIZONTAL = Family(0, 1)
+VERTICAL = Family(1, 0)
+# y goes down the page so these go down to the right and up to the right
+DOWN_DIAGONAL = Family(1, -1)
+UP_DIAGONAL = Family(1, 1)
+FAMILIES = (HORIZONTAL, VERTICAL, DOWN_DIAGONAL, UP_DIAGONAL)
+
+
+class Segments:
+    """Vent lines of one family as the line id and first and last position"""
+    def __init__(self) -> None:
+        self.line_ids: array.array[int] = array.array('q')
+        self.starts: array.array[int] = array.array('q')
+        self.ends: array.array[int] = array.array('q')
+
+    def add(self, family: Family, x1: int, y1: int, x2: int, y2: int) -> None:
+        self.line_ids.append(family.line_id(x1, y1))
+        self.starts.append(min(family.position(x1, y1), family.position(x2, y2)))
+        self.ends.append(max(family.position(x1, y1), family.position(x2, y2)))
+
+    def __iter__(self) -> Iterator[tuple[int, int, int]]:
+        return zip(self.line_ids, self.starts, self.ends)
+
+
+def read_vents(input_file: aoc.InputType) -> tuple[dict[Family, Segments], tuple[int, int, int, int]]:
+    """The vent lines by family (lines not at 45 degrees are dropped) and their bounding box"""
+    segments = {family: Segments() for family in FAMILIES}
+    min_x = min_y = sys.maxsize
+    max_x = max_y = -sys.maxsize
+    with aoc.open_input(input_file) as f:
+        while lines := f.readlines(CHUNK_LINES_HINT):
+            coords = iter(map(int, number_re.findall(''.join(lines))))
+            for x1, y1, x2, y2 in zip(coords, coords, coords, coords):
+                if y1 == y2:
+                    family = HORIZONTAL
+                elif x1 == x2:
+                    family = VERTICAL
+                elif x2 - x1 == y2 - y1:
+                    family = DOWN_DIAGONAL
+                elif x2 - x1 == y1 - y2:
+                    family = UP_DIAGONAL
+                else:
+                    continue
+                segments[family].add(family, x1, y1, x2, y2)
+                min_x, max_x = min(min_x, x1, x2), max(max_x, x1, x2)
+                min_y, max_y = min(min_y, y1, y2), max(max_y, y1, y2)
+    return segments, (min_x, min_y, max_x, max_y)
+
+
+def dense_overlaps(segments: dict[Family, Segments],
+                   bounds: tuple[int, int, int, int]) -> tuple[int, int]:
+    """
+    Count on a grid covering the vents, a byte per point. Laid out row major
+    every vent line is a strided slice of the grid (stepping 1 along a row,
+    the width down a column and one either side of that along a diagonal) so
+    each is drawn in one go by translating its counts up by one.
+    """
+    min_x, min_y, max_x, max_y = bounds
+    width = max_x - min_x + 1
+    grid = bytearray(width * (max_y - min_y + 1))
+    # Position goes up along each family's lines by one row, apart from
+    # horizontal lines which go along one column
+    steps = {HORIZONTAL: 1, VERTICAL: width, DOWN_DIAGONAL: width + 1, UP_DIAGONAL: width - 1}
+
+    results = []
+    for families in ((HORIZONTAL, VERTICAL), (DOWN_DIAGONAL, UP_DIAGONAL)):
+        for family in families:
+            step = steps[family]
+            for line_id, start, end in segments[family]:
+                x, y = family.point_at(line_id, start)
+                first = (y - min_y) * width + x - min_x
+                line = slice(first, first + (end - start) * step + 1, step)
+                grid[line] = grid[line].translate(ADD_ONE)
+        # The diagonals are drawn on top of the horizontal and vertical lines
+        results.append(grid.count(OVERLAPPED))
+    return results[0], results[1]
+
+
+Intervals = dict[int, list[tuple[int, int]]]
+
+
+def coverage(segments: Segments) -> tuple[Intervals, Intervals]:
+    """Per line id, the stretches covered by at least one and at least two segments"""
+    events_by_id: dict[int, list[tuple[int, int]]] = collections.defaultdict(list)
+    for line_id, start, end in segments:
+        events_by_id[line_id].extend(((start, 1), (end + 1, -1)))
+
+    covered: Intervals = {}
+    overlapped: Intervals = {}
+    for line_id, events in events_by_id.items():
+        once: list[tuple[int, int]] = []
+        twice: list[tuple[int, int]] = []
+        count = 0
+        prev_pos = 0
+        for pos, delta in sorted(events):
+            if count and pos > prev_pos:
+                for intervals, min_count in ((once, 1), (twice, 2)):
+                    if count < min_count:
+                        continue
+                    if intervals and intervals[-1][1] + 1 == prev_pos:
+                        intervals[-1] = (intervals[-1][0], pos - 1)
+                    else:
+                        intervals.append((prev_pos, pos - 1))
+            count += delta
+            prev_pos = pos
+        covered[line_id] = once
+        if twice:
+            overlapped[line_id] = twice
+    return covered, overlapped
+
+
+def crossings(family_a: Family, covered_a: Intervals,
+              family_b: Family, covered_b: Intervals) -> Iterator[tuple[int, int]]:
+    """
+    The points where lines of two families cross. In coordinates of the two
+    families' line ids the lines of one run across and the other down, so a
+    sweep across family b's ids with the family a lines in range finds them.
+    """
+    # (b id, order, a id or range start, range end) ordering starts, then
+    # crossings, then ends at the same b id
+    events = []
+    for id_a, intervals in covered_a.items():
+        for start, end in intervals:
+            ends_b = [family_b.line_id(*family_a.point_at(id_a, pos)) for pos in (start, end)]
+            events.append((min(ends_b), 0, id_a, 0))
+            events.append((max(ends_b), 2, id_a, 0))
+    for id_b, intervals in covered_b.items():
+        for start, end in intervals:
+            ends_a = [family_a.line_id(*family_b.point_at(id_b, pos)) for pos in (start, end)]
+            events.append((id_b, 1, min(ends_a), max(ends_a)))
+    events.sort()
+
+    det = family_a.x_coef * family_b.y_coef - family_a.y_coef * family_b.x_coef
+    active: list[int] = []
+    for id_b, order, low_a, high_a in events:
+        if order == 0:
+            bisect.insort(active, low_a)
+        elif order == 2:
+            active.pop(bisect.bisect_left(active, low_a))
+        else:
+            for id_a in active[bisect.bisect_left(active, low_a):
+                               bisect.bisect_right(active, high_a)]:
+                # Solve for the point on both lines, the diagonals only cross
+                # at a whole point half the time
+                x_det = id_a * family_b.y_coef - family_a.y_coef * id_b
+                y_det = family_a.x_coef * id_b - id_a * family_b.x_coef
+                if x_det % det == 0 and y_det % det == 0:
+                    yield x_det // det, y_det // det
+
+
+def sparse_overlaps(segments: dict[Family, Segments]) -> tuple[int, int]:
+    """
+    Count without a grid. A point is covered by two or more vents if it's
+    covered twice within one family, or at all by two or more families. The
+    latter are only where lines cross so:
+        overlaps = sum(points covered twice in each family)
+                   + sum(1 - families covering twice) over the crossing points
+    """
+    covered = {}
+    overlapped = {}
+    for family in FAMILIES:
+        covered[family], overlapped[family] = coverage(segments[family])
+
+    def is_overlapped(family: Family, x: int, y: int) -> bool:
+        intervals = overlapped[family].get(family.line_id(x, y), [])
+        pos = family.position(x, y)
+        idx = bisect.bisect_right(intervals, (pos, sys.maxsize)) - 1
+        return idx >= 0 and intervals[idx][1] >= pos
+
+    results = []
+    for families in ((HORIZONTAL, VERTICAL), FAMILIES):
+        overlaps = sum(end - start + 1 for family in families
+                       for intervals in overlapped[family].values()
+                       for start, end in intervals)
+        crossing_points: set[tuple[int, int]] = set()
+        for family_a, family_b in itertools.combinations(families, 2):
+            crossing_points.update(crossings(family_a, covered[family_a],
+                                             family_b, covered[family_b]))
+        for point in crossing_points:
+            overlaps += 1 - sum(is_overlapped(family, *point) for family in families)
+        results.append(overlaps)
+    return results[0], results[1]
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    segments, bounds = read_vents(input_file)
+    if not any(segments[family].line_ids for family in FAMILIES):
+        return (0, 0)
+    min_x, min_y, max_x, max_y = bounds
+    if (max_x - min_x + 1) * (max_y - min_y + 1) <= DENSE_MAX_POINTS:
+        return dense_overlaps(segments, bounds)
+    return sparse_overlaps(segments)
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
@@ -4,36 +4,69 @@ Advent Of Code 2021 Day 6
 """
 
 import sys
-import time
-import collections
 
+from typing import Iterable, Optional
 
-def p1p2(input_file: str) -> tuple[int, int]:
-    num_by_days_to_pop = collections.deque([0] * 9, maxlen=9)
-    with open(input_file) as f:
+import aoc
+import matrix
+
+
+Counts = tuple[int, ...]
+
+# Fish are counted by days until they next spawn, 0 to 8
+NUM_TIMERS = 9
+
+
+def one_day() -> matrix.Matrix:
+    """Row i gives how many fish with i days to go come from each count a day before"""
+    rows = [[0] * NUM_TIMERS for _ in range(NUM_TIMERS)]
+    for timer in range(NUM_TIMERS - 1):
+        rows[timer][timer + 1] = 1
+    # Those that spawn go back to 6 and their young start at 8
+    rows[6][0] = 1
+    rows[8][0] = 1
+    return tuple(tuple(row) for row in rows)
+
+
+# one_day() ** (2 ** i) at index i, kept per modulus between calls
+_powers: matrix.Powers = {}
+
+
+def populations(counts: Counts, horizons: Iterable[int],
+                modulus: Optional[int] = None) -> list[int]:
+    """
+    The total number of fish after each number of days in horizons (modulo
+    modulus if given, the counts get very big very quickly). The horizons
+    are answered in order of days, each advancing from the one before.
+    """
+    horizons = list(horizons)
+    if any(horizon < 0 for horizon in horizons):
+        raise ValueError("Can only project forward in time")
+    totals = [0] * len(horizons)
+    day = 0
+    for idx in sorted(range(len(horizons)), key=horizons.__getitem__):
+        counts = matrix.advance(one_day(), _powers, counts, horizons[idx] - day, modulus)
+        day = horizons[idx]
+        totals[idx] = sum(counts) if modulus is None else sum(counts) % modulus
+    return totals
+
+
+def read_counts(input_file: aoc.InputType) -> Counts:
+    num_by_days_to_pop = [0] * NUM_TIMERS
+    with aoc.open_input(input_file) as f:
         for days_to_pop_str in next(f).split(','):
             num_by_days_to_pop[int(days_to_pop_str)] += 1
+    return tuple(num_by_days_to_pop)
 
-    part1_res: int = 0
-    for day_num in range(256):
-        popping = num_by_days_to_pop.popleft()
-        # Reset days-to-pop to 6 for those that just have popped
-        num_by_days_to_pop[6] += popping
-        # Add the new kids with days-to-pop of 8
-        num_by_days_to_pop.append(popping)
-        if day_num == 79:
-            part1_res = sum(num_by_days_to_pop)
 
-    return (part1_res, sum(num_by_days_to_pop))
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    part1_res, part2_res = populations(read_counts(input_file), (80, 256))
+    return (part1_res, part2_res)
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
-    sys.exit(main(sys.argv[1:]))
\ No newline at end of file
+    sys.exit(main(sys.argv[1:]))
@@ -5,37 +5,70 @@ Advent Of Code 2021 Day 7
 
 import sys
 import math
-import time
-import statistics
+import bisect
+import itertools
 
+import aoc
 
-def calc_triangular_fuel(target_posn: int, horiz_posns: list[int]) -> int:
-    return sum((abs(target_posn - horiz_posn) * (abs(target_posn - horiz_posn) + 1)) // 2
-               for horiz_posn in horiz_posns)
 
+class FuelCosts:
+    """
+    The fuel for every crab to move to any target, from prefix sums of the
+    sorted crab positions. With d the distance a crab moves, linear fuel is
+    d and triangular fuel is d * (d + 1) / 2 = (d**2 + d) / 2. The sum of d**2
+    over all crabs expands to n * t**2 - 2 * t * sum(p) + sum(p**2) so only
+    the sum of d needs to know which crabs are either side of the target.
+    """
+    def __init__(self, positions: list[int]) -> None:
+        self.positions = sorted(positions)
+        self.num_crabs = len(self.positions)
+        # Sums of the first k positions at index k
+        self.prefix_sums = list(itertools.accumulate(self.positions, initial=0))
+        self.sum_squares = sum(position * position for position in self.positions)
 
-def p1p2(input_file: str) -> tuple[int, int]:
-    with open(input_file) as f:
-        horiz_positions = [int(x_str) for x_str in next(f).split(',')]
+    def linear(self, target: int) -> int:
+        num_below = bisect.bisect_left(self.positions, target)
+        sum_below = self.prefix_sums[num_below]
+        sum_above = self.prefix_sums[-1] - sum_below
+        return (target * num_below - sum_below +
+                sum_above - target * (self.num_crabs - num_below))
 
-    best_position = int(statistics.median(horiz_positions))
-    p1_fuel_required = sum(abs(best_position - horiz_position)
-                           for horiz_position in horiz_positions)
+    def triangular(self, target: int) -> int:
+        sum_squared_distances = (self.num_crabs * target * target -
+                                 2 * target * self.prefix_sums[-1] + self.sum_squares)
+        return (sum_squared_distances + self.linear(target)) // 2
 
-    # Best position is either mean rounded up or down, try both pick best
-    mean = statistics.mean(horiz_positions)
-    fuel_targets = [(calc_triangular_fuel(target, horiz_positions), target)
-                    for target in range(math.floor(mean), math.ceil(mean) + 1)]
-    fuel_required, best_position = min(fuel_targets, key=lambda x: x[0])
+    def curve(self, triangular: bool = False) -> list[tuple[int, int]]:
+        """(target, fuel) for every target from the first crab to the last"""
+        cost = self.triangular if triangular else self.linear
+        return [(target, cost(target))
+                for target in range(self.positions[0], self.positions[-1] + 1)]
 
+    def best_linear(self) -> tuple[int, int]:
+        """(target, fuel) using the least linear fuel, a median position"""
+        median = self.positions[(self.num_crabs - 1) // 2]
+        return median, self.linear(median)
+
+    def best_triangular(self) -> tuple[int, int]:
+        """(target, fuel) using the least triangular fuel"""
+        # The best target is within half a position of the mean
+        mean = self.prefix_sums[-1] / self.num_crabs
+        return min(((target, self.triangular(target))
+                    for target in range(math.floor(mean - 0.5), math.ceil(mean + 0.5) + 1)),
+                   key=lambda target_fuel: target_fuel[1])
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    with aoc.open_input(input_file) as f:
+        fuel_costs = FuelCosts([int(x_str) for x_str in next(f).split(',')])
+
+    _, p1_fuel_required = fuel_costs.best_linear()
+    _, fuel_required = fuel_costs.best_triangular()
     return (p1_fuel_required, fuel_required)
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    print(f"Elapsed: {time.perf_counter() - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
@@ -4,111 +4,83 @@ Advent Of Code 2021 Day 8
 """
 
 import sys
-import time
-import collections
-import dataclasses
-
-
-num_to_unique_num_segments = {
-    1: 2,
-    4: 4,
-    7: 3,
-    8: 7,
-}
-
-
-@dataclasses.dataclass
-class WireSegment:
-    txt_to_num: dict[str, int] = dataclasses.field(default_factory=dict)
-    known_num: dict[int, set[str]] = \
-        dataclasses.field(default_factory=dict)
-
-    def add_num_to_txt(self, num: int, txt: set[str]) -> None:
-        self.txt_to_num[''.join(sorted(txt))] = num
-        self.known_num[num] = txt
-
-    def solve(self, signal_patterns: list[str]) -> None:
-        real_to_broken_seg = {}
-        signals_by_len = collections.defaultdict(list)
-        for signal_str in signal_patterns:
-            signals_by_len[len(signal_str)].append(set(signal_str))
-
-        # Add the numbers with unique number of segments used: 1, 4, 7 and 8
-        for number, num_segments in num_to_unique_num_segments.items():
-            self.add_num_to_txt(number, signals_by_len[num_segments][0])
-
-        # Find the segments that the signals of length 6 have in common
-        # This translates to the numbers 0, 6 and 9
-        # The true segments these have in common are a, b, f and g
-        len6_in_common = set.intersection(
-                                     *[signal for signal in signals_by_len[6]])
-
-        # Since 7 uses segments a, c and f taking out the above leaves
-        # segment c
-        real_to_broken_seg['c'] = (
-                  self.known_num[7] - len6_in_common).pop()
-        # Now 'c' is known the other segment for 1 is 'f'
-        real_to_broken_seg['f'] = (
-                  self.known_num[1] - set(real_to_broken_seg['c'])).pop()
-        # Segments in 4 not used by 1 are b and d - of these only b is in
-        # len6_in_common leaving d
-        real_to_broken_seg['d'] = (
-                  self.known_num[4] - self.known_num[1] - len6_in_common).pop()
-
-        # Identify the 3 numbers that use 5 segments (2, 3 and 5)
-        for signal in signals_by_len[5]:
-            if real_to_broken_seg['c'] not in signal:
-                # Only 5 doesn't use segment c
-                self.add_num_to_txt(5, signal)
-            elif real_to_broken_seg['f'] not in signal:
-                # Only 2 doesn't use segment f
-                self.add_num_to_txt(2, signal)
-            else:
-                # Only 3 uses both c and f
-                self.add_num_to_txt(3, signal)
-
-        # Identify the 3 numbers that use 6 segments (0, 6 and 9)
-        for signal in signals_by_len[6]:
-            if real_to_broken_seg['c'] not in signal:
-                # Only 6 doesn't use c
-                self.add_num_to_txt(6, signal)
-            elif real_to_broken_seg['d'] not in signal:
-                # Only 0 doesn't use d
-                self.add_num_to_txt(0, signal)
-            else:
-                # Only 9 uses both c and d
-                self.add_num_to_txt(9, signal)
-
-    def decode(self, value: str) -> int:
-        return self.txt_to_num[''.join(sorted(value))]
-
-
-def p1p2(input_file: str) -> tuple[int, int]:
+import functools
+import itertools
+
+from typing import Iterable, Iterator
+
+import aoc
+
+
+WIRES = 'abcdefg'
+DIGIT_SEGMENTS = ('abcefg', 'cf', 'acdeg', 'acdfg', 'bcdf',
+                  'abdfg', 'abdefg', 'acf', 'abcdefg', 'abcdfg')
+# Digits that can be told apart by their number of segments alone
+UNIQUE_LENGTH_DIGITS = frozenset((1, 4, 7, 8))
+
+# Each pattern is a 7 bit mask with bit 0 for wire a up to bit 6 for wire g.
+# The table maps a display's set of ten pattern masks, which doesn't depend
+# on the order the patterns or their wires are written in, to the digit of
+# each pattern mask.
+DecodeTable = dict[frozenset[int], dict[int, int]]
+
+
+# There are only so many ways of writing out up to seven wires, far fewer
+# than the patterns in a big input
+@functools.cache
+def pattern_mask(pattern: str) -> int:
+    mask = 0
+    for wire in pattern:
+        mask |= 1 << (ord(wire) - ord('a'))
+    return mask
+
+
+@functools.cache
+def decode_table() -> DecodeTable:
+    """Built from every one of the 5040 ways the wires could be crossed"""
+    table = {}
+    for crossed_wires in itertools.permutations(WIRES):
+        crossing = str.maketrans(WIRES, ''.join(crossed_wires))
+        digit_masks = {pattern_mask(segments.translate(crossing)): digit
+                       for digit, segments in enumerate(DIGIT_SEGMENTS)}
+        table[frozenset(digit_masks)] = digit_masks
+    return table
+
+
+def decode_displays(lines: Iterable[str]) -> Iterator[tuple[int, ...]]:
+    """The output digits of each display"""
+    table = decode_table()
+    for line in lines:
+        signal_patterns, output_values = line.split(' | ')
+        digit_masks = table[frozenset(map(pattern_mask, signal_patterns.split()))]
+        yield tuple(digit_masks[pattern_mask(output_value)]
+                    for output_value in output_values.split())
+
+
+def sum_displays(lines: Iterable[str]) -> tuple[int, int]:
+    """The number of output digits with a unique number of segments and the sum of the outputs"""
     unique_count = 0
     output_value_sum = 0
-    with open(input_file) as f:
-        for line in f:
-            signal_patterns, output_values = line.strip().split(' | ')
-            wire_segment = WireSegment()
-            wire_segment.solve(signal_patterns.split())
-            # Concatenate each digit in a string to get the actual value
-            output_val_str = ''
-            for output_value in output_values.split():
-                num = wire_segment.decode(output_value)
-                # Part 1 work
-                unique_count += 1 if num in num_to_unique_num_segments else 0
-                output_val_str += str(num)
-            output_value_sum += int(output_val_str)
-
+    for digits in decode_displays(lines):
+        unique_count += sum(digit in UNIQUE_LENGTH_DIGITS for digit in digits)
+        output_value_sum += functools.reduce(lambda value, digit: value * 10 + digit, digits)
     return unique_count, output_value_sum
 
 
+def add_sums(chunk_sums: list[tuple[int, int]]) -> tuple[int, int]:
+    """The unique digit counts and output value sums of all the chunks added up"""
+    return (sum(unique_count for unique_count, _ in chunk_sums),
+            sum(output_value_sum for _, output_value_sum in chunk_sums))
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    # Build the table before any pool forks so the workers share it
+    decode_table()
+    return aoc.map_reduce_line_chunks(sum_displays, add_sums, input_file)
+
+
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
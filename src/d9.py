@@ -3,79 +3,137 @@
 Advent Of Code 2021 Day 9
 """
 
-from __future__ import annotations
-
+import re
 import sys
 import math
-import time
-
-from typing import Iterator, Sequence
-
-
-def adjacent_values(lines: Sequence[str], line_num: int, column: int) -> Iterator[tuple[str, int, int]]:
-    for vert_delta, horiz_delta in ((-1, 0), (0, -1), (0, 1), (1, 0)):
-        yield lines[line_num + vert_delta][column + horiz_delta], line_num + vert_delta, column + horiz_delta
-
-
-def get_line_low_points(lines: Sequence[str], line_num: int, width: int) -> list[tuple[int, int, int]]:
-    low_points = []
-    for column in range(1, width + 1):
-        value_being_checked = lines[line_num][column]
-        if all(value_being_checked < adj_value for adj_value, _, _ in adjacent_values(lines, line_num, column)):
-            low_points.append((int(value_being_checked), line_num, column))
-    return low_points
-
-
-def get_basin_size(lines: Sequence[str], start_line: int, start_column: int) -> int:
-    # A list of points in this basin - starts with the low point
-    basin_points = [(start_line, start_column)]
-    # Have a set form so we can check if a point has already been 'visited'
-    basin_point_set = set(basin_points)
-
-    # Go through each point and check if there are adjacent points to add to the basin
-    for line_num, column_num in basin_points:
-        check_value = lines[line_num][column_num]
-        for adj_value, adj_line_num, adj_column_num in adjacent_values(lines, line_num, column_num):
-            if adj_value != '9' and check_value < adj_value and (adj_line_num, adj_column_num) not in basin_point_set:
-                basin_points.append((adj_line_num, adj_column_num))
-                basin_point_set.add((adj_line_num, adj_column_num))
-
-    return len(basin_points)
-
-
-def p1p2(input_file: str) -> tuple[int, int]:
-    # Read all the lines but padd with 9's to make the boundaries easier
-    lines = []
-    with open(input_file) as f:
-        first_line = next(f).strip()
-        width = len(first_line)
-        lines.append('9' * (width + 2))
-        lines.append('9' + first_line + '9')
-        lines.extend(['9' + line + '9' for line in f.read().splitlines()])
-    lines.append('9' * (width + 2))
-
-    # Now find the low points or centre of basins
-    basins = []
-    for line_num in range(1, len(lines) - 1):
-        basins.extend(get_line_low_points(lines, line_num, width))
-    
-    # Get the sizes of each basin
-    basin_sizes = []
-    for basin_val, line_num, column_num in basins:
-        basin_sizes.append(get_basin_size(lines, line_num, column_num))
-
-    print(f"{len(basins)=}")
-    return (sum(lp[0] for lp in basins) + len(basins),
-            math.prod(sorted(basin_sizes, reverse=True)[:3]))
+import heapq
+
+from typing import Iterable, Iterator, Optional
+
+import aoc
+
+
+# Runs of cells that are in basins, 9s are the walls between them
+basin_run_re = re.compile(r"[0-8]+")
+# Sorts after every height so off the map is never lower
+OFF_MAP = ':'
+
+# (first column, column after the last, basin label) of a run in a row
+BasinRun = tuple[int, int, int]
+
+
+class Basins:
+    """Union find over the basin labels of the runs in the rows seen so far"""
+    def __init__(self) -> None:
+        self.parent: dict[int, int] = {}
+        self.size: dict[int, int] = {}
+        self.next_label = 0
+
+    def new(self, size: int) -> int:
+        label = self.next_label
+        self.next_label += 1
+        self.parent[label] = label
+        self.size[label] = size
+        return label
+
+    def find(self, label: int) -> int:
+        while self.parent[label] != label:
+            # Path halving
+            self.parent[label] = self.parent[self.parent[label]]
+            label = self.parent[label]
+        return label
+
+    def union(self, label: int, other: int) -> None:
+        root, other_root = self.find(label), self.find(other)
+        if root == other_root:
+            return
+        if self.size[root] < self.size[other_root]:
+            root, other_root = other_root, root
+        self.parent[other_root] = root
+        self.size[root] += self.size.pop(other_root)
+
+    def compact(self, roots: Iterable[int]) -> None:
+        """Forget every label other than these roots"""
+        self.parent = {root: root for root in roots}
+        self.size = {root: self.size[root] for root in self.parent}
+
+
+def low_point_risk(above: Optional[str], row: str, below: Optional[str]) -> int:
+    above = above or OFF_MAP * len(row)
+    below = below or OFF_MAP * len(row)
+    left = OFF_MAP + row[:-1]
+    right = row[1:] + OFF_MAP
+    return sum(int(height) + 1 for height, *neighbours in zip(row, above, below, left, right)
+               if height < min(neighbours))
+
+
+def windows(rows: Iterator[str]) -> Iterator[tuple[Optional[str], str, Optional[str]]]:
+    """Each row with the rows above and below it"""
+    above = None
+    row = next(rows, None)
+    while row is not None:
+        below = next(rows, None)
+        yield above, row, below
+        above, row = row, below
+
+
+def survey(input_file: aoc.InputType, top_k: int = 3) -> tuple[int, list[int]]:
+    """
+    The total risk of the low points and the sizes of the top_k biggest basins.
+    The map is read a row at a time, only the rows either side of the one
+    being looked at and the basins' runs in the previous row are kept.
+    """
+    risk = 0
+    basins = Basins()
+    # Min heap of the biggest basin sizes so far
+    biggest: list[int] = []
+    prev_runs: list[BasinRun] = []
+
+    def finished(size: int) -> None:
+        if len(biggest) < top_k:
+            heapq.heappush(biggest, size)
+        else:
+            heapq.heappushpop(biggest, size)
+
+    with aoc.open_input(input_file) as f:
+        for above, row, below in windows(line.rstrip('\n') for line in f):
+            risk += low_point_risk(above, row, below)
+
+            runs: list[BasinRun] = []
+            prev_idx = 0
+            for match in basin_run_re.finditer(row):
+                start, end = match.span()
+                label = basins.new(end - start)
+                # Join with every run above that it touches
+                while prev_idx < len(prev_runs) and prev_runs[prev_idx][1] <= start:
+                    prev_idx += 1
+                for prev_start, _, prev_label in prev_runs[prev_idx:]:
+                    if prev_start >= end:
+                        break
+                    basins.union(label, prev_label)
+                runs.append((start, end, label))
+
+            # Basins in the row above that didn't carry on into this row are done
+            roots = {basins.find(label) for _, _, label in runs}
+            for done_root in {basins.find(label) for _, _, label in prev_runs} - roots:
+                finished(basins.size[done_root])
+            prev_runs = [(start, end, basins.find(label)) for start, end, label in runs]
+            basins.compact(roots)
+
+    for root in {label for _, _, label in prev_runs}:
+        finished(basins.size[root])
+    return risk, sorted(biggest, reverse=True)
+
+
+def p1p2(input_file: aoc.InputType) -> tuple[int, int]:
+    risk, basin_sizes = survey(input_file)
+    print(f"{basin_sizes=}")
+    return (risk, math.prod(basin_sizes))
 
 
 def main(cli_args: list[str]) -> int:
-    start = time.perf_counter()
-    print(p1p2(cli_args[0]))
-    stop = time.perf_counter()
-    print(f"Elapsed: {stop - start:.6f}s")
-    return 0
+    return aoc.main(cli_args, p1p2)
 
 
 if __name__ == "__main__":
-    sys.exit(main(sys.argv[1:]))
\ No newline at end of file
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,488 @@
+#!/bin/env python3
+"""
+Generate synthetic puzzle inputs for each day at a given scale
+
+A scale of 1 gives an input about the size of the real puzzle input and the
+size of the input grows linearly with scale (so grids grow by sqrt(scale) in
+each dimension). The same day, scale and seed always give the same input.
+"""
+
+from __future__ import annotations
+
+import io
+import sys
+import math
+import random
+import string
+import pathlib
+import argparse
+import itertools
+
+from typing import Any, Callable
+
+import aoc
+
+
+Generator = Callable[[float, random.Random], str]
+
+# Days whose generators have changed what they make, so inputs generated
+# before are made again
+GENERATOR_VERSIONS = {'d11': 2, 'd23': 2}
+
+GENERATED_DIR = aoc.REPO_ROOT / '.cache' / 'generated'
+
+
+def scaled(base: int, scale: float, minimum: int = 1) -> int:
+    return max(minimum, round(base * scale))
+
+
+def scaled_side(base: int, scale: float, minimum: int = 1) -> int:
+    return max(minimum, round(base * math.sqrt(scale)))
+
+
+def digit_grid(width: int, height: int, rng: random.Random,
+               digits: str = string.digits) -> str:
+    return '\n'.join(''.join(rng.choices(digits, k=width))
+                     for _ in range(height)) + '\n'
+
+
+def gen_d1(scale: float, rng: random.Random) -> str:
+    depth = rng.randint(100, 200)
+    depths = []
+    for _ in range(scaled(2000, scale)):
+        depth = max(0, depth + rng.randint(-10, 15))
+        depths.append(depth)
+    return ''.join(f"{depth}\n" for depth in depths)
+
+
+def gen_d2(scale: float, rng: random.Random) -> str:
+    actions = rng.choices(('forward', 'down', 'up'), weights=(5, 3, 2),
+                          k=scaled(1000, scale))
+    return ''.join(f"{action} {rng.randint(1, 9)}\n" for action in actions)
+
+
+def gen_d3(scale: float, rng: random.Random) -> str:
+    # The life support search needs the numbers to be unique
+    num_values = scaled(1000, scale, minimum=2)
+    bits = max(12, num_values.bit_length() + 1)
+    values = rng.sample(range(2 ** bits), num_values)
+    return ''.join(f"{value:0{bits}b}\n" for value in values)
+
+
+def bingo_win_rank(board: list[int], call_rank: dict[int, int]) -> int:
+    ranks = [call_rank[number] for number in board]
+    lines = ([ranks[row * 5:row * 5 + 5] for row in range(5)] +
+             [ranks[col::5] for col in range(5)])
+    return min(max(line) for line in lines)
+
+
+def gen_d4(scale: float, rng: random.Random) -> str:
+    num_boards = scaled(100, scale, minimum=2)
+    numbers = list(range(max(100, num_boards)))
+    calls = numbers[:]
+    rng.shuffle(calls)
+    call_rank = {number: rank for rank, number in enumerate(calls)}
+    boards = [rng.sample(numbers, 25) for _ in range(num_boards)]
+    # The last board to win has to be the only one to win on that call
+    while True:
+        win_ranks = [bingo_win_rank(board, call_rank) for board in boards]
+        last_winners = [idx for idx, rank in enumerate(win_ranks)
+                        if rank == max(win_ranks)]
+        if len(last_winners) == 1:
+            break
+        for idx in last_winners[1:]:
+            boards[idx] = rng.sample(numbers, 25)
+
+    lines = [','.join(map(str, calls))]
+    for board in boards:
+        lines.append('')
+        lines.extend(' '.join(f"{number:2}" for number in board[row * 5:row * 5 + 5])
+                     for row in range(5))
+    return '\n'.join(lines) + '\n'
+
+
+def gen_d5(scale: float, rng: random.Random) -> str:
+    size = scaled_side(1000, scale)
+    lines: list[str] = []
+    while len(lines) < scaled(500, scale):
+        x1, y1 = rng.randrange(size), rng.randrange(size)
+        direction = rng.choice(('h', 'v', 'd', 'd'))
+        if direction == 'h':
+            x2, y2 = rng.randrange(size), y1
+        elif direction == 'v':
+            x2, y2 = x1, rng.randrange(size)
+        elif rng.random() < 0.5:
+            # Diagonal going down to the right
+            length = rng.randint(-min(x1, y1), min(size - 1 - x1, size - 1 - y1))
+            x2, y2 = x1 + length, y1 + length
+        else:
+            # Diagonal going up to the right
+            length = rng.randint(-min(x1, size - 1 - y1), min(size - 1 - x1, y1))
+            x2, y2 = x1 + length, y1 - length
+        if (x1, y1) != (x2, y2):
+            lines.append(f"{x1},{y1} -> {x2},{y2}\n")
+    return ''.join(lines)
+
+
+def gen_d6(scale: float, rng: random.Random) -> str:
+    return ','.join(str(rng.randint(1, 5)) for _ in range(scaled(300, scale))) + '\n'
+
+
+def gen_d7(scale: float, rng: random.Random) -> str:
+    num_crabs = scaled(1000, scale)
+    return ','.join(str(rng.randrange(2 * num_crabs)) for _ in range(num_crabs)) + '\n'
+
+
+segments_by_digit = ('abcefg', 'cf', 'acdeg', 'acdfg', 'bcdf', 'abdfg',
+                     'abdefg', 'acf', 'abcdefg', 'abcdfg')
+
+
+def gen_d8(scale: float, rng: random.Random) -> str:
+    lines = []
+    for _ in range(scaled(200, scale)):
+        wiring = dict(zip('abcdefg', rng.sample('abcdefg', 7)))
+
+        def scrambled(segments: str) -> str:
+            return ''.join(rng.sample([wiring[seg] for seg in segments], len(segments)))
+
+        patterns = [scrambled(segments) for segments in segments_by_digit]
+        rng.shuffle(patterns)
+        outputs = [scrambled(segments_by_digit[rng.randrange(10)]) for _ in range(4)]
+        lines.append(f"{' '.join(patterns)} | {' '.join(outputs)}\n")
+    return ''.join(lines)
+
+
+def random_spans(total: int, max_span: int, rng: random.Random) -> list[tuple[int, int]]:
+    """Split range(total) into spans of 1 to max_span with a gap of 1 between"""
+    spans = []
+    start = 0
+    while start < total:
+        end = min(total, start + rng.randint(1, max_span))
+        spans.append((start, end))
+        start = end + 1
+    return spans
+
+
+def gen_d9(scale: float, rng: random.Random) -> str:
+    # Split the map into rectangular basins walled off by 9s, each basin
+    # slopes up from a single low point so every basin has exactly one
+    width = height = scaled_side(100, scale, minimum=3)
+    grid = [[9] * width for _ in range(height)]
+    for top, bottom in random_spans(height, 5, rng):
+        for left, right in random_spans(width, 5, rng):
+            low_row, low_col = rng.randrange(top, bottom), rng.randrange(left, right)
+            for row in range(top, bottom):
+                for col in range(left, right):
+                    grid[row][col] = abs(row - low_row) + abs(col - low_col)
+    return ''.join(''.join(map(str, row)) + '\n' for row in grid)
+
+
+def gen_d10(scale: float, rng: random.Random) -> str:
+    pairs = (('(', ')'), ('[', ']'), ('{', '}'), ('<', '>'))
+    num_lines = scaled(100, scale)
+    # Need an odd number of incomplete lines for the middle score
+    num_incomplete = (num_lines // 2) | 1
+    lines = []
+    for line_num in range(num_lines):
+        expected_closes: list[str] = []
+        line = ''
+        for _ in range(rng.randint(20, 100)):
+            if expected_closes and rng.random() < 0.4:
+                line += expected_closes.pop()
+            else:
+                opening, closing = rng.choice(pairs)
+                line += opening
+                expected_closes.append(closing)
+        if not expected_closes:
+            opening, closing = rng.choice(pairs)
+            line += opening
+            expected_closes.append(closing)
+        if line_num >= num_incomplete:
+            # Corrupt it with a close that doesn't match
+            line += rng.choice([closing for _, closing in pairs
+                                if closing != expected_closes[-1]])
+        lines.append(line + '\n')
+    rng.shuffle(lines)
+    return ''.join(lines)
+
+
+# Share of the grid to give the same energy on each try at a grid that all
+# flashes together within D11_MAX_STEPS
+D11_SAME_SHARES = (0.0, 0.5, 0.8, 0.9, 0.95, 1.0)
+D11_MAX_STEPS = 1000
+
+
+def gen_d11(scale: float, rng: random.Random) -> str:
+    side = scaled_side(10, scale)
+    octopuses = aoc.import_day('d11').Octopuses
+    # The solution runs until every octopus flashes at once, which random
+    # grids rarely get to. Failing that give more and more of the grid the
+    # same energy, all of it the same flashes together within 10 steps.
+    for same_share in D11_SAME_SHARES:
+        same = rng.choice(string.digits)
+        grid = ''.join(same if rng.random() < same_share else rng.choice(string.digits)
+                       for _ in range(side * side))
+        lines = [grid[row * side:(row + 1) * side] for row in range(side)]
+        if side * side in itertools.islice(octopuses(lines).flash_counts(), D11_MAX_STEPS):
+            break
+    return '\n'.join(lines) + '\n'
+
+
+def gen_d12(scale: float, rng: random.Random) -> str:
+    num_small = scaled(6, scale, minimum=2)
+    small = [''.join(rng.choices(string.ascii_lowercase, k=2)) + str(idx)
+             for idx in range(num_small)]
+    big = [''.join(rng.choices(string.ascii_uppercase, k=2)) + str(idx)
+           for idx in range(max(1, num_small // 3))]
+    caves = small + big
+    edges = [('start', rng.choice(caves)), (rng.choice(caves), 'end')]
+    # Join random pairs of caves - but never two big caves or there would be
+    # infinitely many paths
+    while len(edges) < scaled(22, scale, minimum=4):
+        cave1, cave2 = rng.sample(caves + ['start', 'end'], 2)
+        if ((cave1 in big and cave2 in big) or {cave1, cave2} == {'start', 'end'} or
+                (cave1, cave2) in edges or (cave2, cave1) in edges):
+            continue
+        edges.append((cave1, cave2))
+    return ''.join(f"{cave1}-{cave2}\n" for cave1, cave2 in edges)
+
+
+def gen_d13(scale: float, rng: random.Random) -> str:
+    # Start from the folded up paper and unfold it
+    width, height = 40, 6
+    dots = {(x, y) for x in range(width) for y in range(height) if rng.random() < 0.4}
+    folds: list[tuple[str, int]] = []
+    for fold_num in range(max(2, round(12 + math.log2(scale)))):
+        dimension = 'x' if fold_num % 2 == 0 else 'y'
+        size = width if dimension == 'x' else height
+        folds.append((dimension, size))
+        unfolded = set()
+        for x, y in dots:
+            if rng.random() < 0.5:
+                if dimension == 'x':
+                    x = 2 * size - x
+                else:
+                    y = 2 * size - y
+            unfolded.add((x, y))
+        dots = unfolded
+        if dimension == 'x':
+            width = 2 * width + 1
+        else:
+            height = 2 * height + 1
+    # Top up with random dots to hit the requested scale, no dot can be on
+    # a fold line
+    fold_xs = {size for dimension, size in folds if dimension == 'x'}
+    fold_ys = {size for dimension, size in folds if dimension == 'y'}
+    while len(dots) < scaled(800, scale):
+        dots.add((rng.randrange(width), rng.randrange(height)))
+    dot_list = [(x, y) for x, y in dots if x not in fold_xs and y not in fold_ys]
+    rng.shuffle(dot_list)
+    return (''.join(f"{x},{y}\n" for x, y in dot_list) + '\n' +
+            ''.join(f"fold along {dimension}={size}\n"
+                    for dimension, size in reversed(folds)))
+
+
+def gen_d14(scale: float, rng: random.Random) -> str:
+    elements = rng.sample(string.ascii_uppercase, 10)
+    template = ''.join(rng.choices(elements, k=scaled(20, scale, minimum=2)))
+    rules = [f"{first}{second} -> {rng.choice(elements)}"
+             for first, second in itertools.product(elements, repeat=2)]
+    return template + '\n\n' + '\n'.join(rules) + '\n'
+
+
+def gen_d15(scale: float, rng: random.Random) -> str:
+    side = scaled_side(100, scale, minimum=2)
+    return digit_grid(side, side, rng, digits='123456789')
+
+
+def packet_bits(rng: random.Random, size: int, depth: int = 0) -> str:
+    version = f"{rng.randrange(8):03b}"
+    if size <= 1 or depth >= 8:
+        value = rng.randrange(2 ** rng.randint(1, 32))
+        groups = []
+        value_bits = f"{value:b}"
+        value_bits = value_bits.zfill(-(-len(value_bits) // 4) * 4)
+        for idx in range(0, len(value_bits), 4):
+            last = idx + 4 == len(value_bits)
+            groups.append(('0' if last else '1') + value_bits[idx:idx + 4])
+        return version + '100' + ''.join(groups)
+
+    pak_type = rng.choice((0, 1, 2, 3, 5, 6, 7))
+    num_subpackets = 2 if pak_type >= 5 else rng.randint(1, min(size, 10))
+    subpackets = ''.join(packet_bits(rng, (size - 1) // num_subpackets, depth + 1)
+                         for _ in range(num_subpackets))
+    if len(subpackets) < 2 ** 15 and rng.random() < 0.5:
+        return version + f"{pak_type:03b}" + '0' + f"{len(subpackets):015b}" + subpackets
+    return version + f"{pak_type:03b}" + '1' + f"{num_subpackets:011b}" + subpackets
+
+
+def gen_d16(scale: float, rng: random.Random) -> str:
+    lines = []
+    for _ in range(scaled(1, scale)):
+        bits = packet_bits(rng, 250)
+        bits += '0' * (-len(bits) % 4)
+        lines.append(''.join(f"{int(bits[idx:idx + 4], 2):X}"
+                             for idx in range(0, len(bits), 4)) + '\n')
+    return ''.join(lines)
+
+
+def gen_d17(scale: float, rng: random.Random) -> str:
+    x_min = scaled(rng.randint(100, 150), scale, minimum=10)
+    y_min = -scaled(rng.randint(80, 120), scale, minimum=10)
+    return (f"target area: x={x_min}..{x_min + scaled(35, scale, minimum=3)}, "
+            f"y={y_min}..{y_min + scaled(25, scale, minimum=3)}\n")
+
+
+def snailfish_number(rng: random.Random, depth: int = 0) -> Any:
+    return [rng.randint(0, 9) if depth == 3 or rng.random() < 0.3
+            else snailfish_number(rng, depth + 1) for _ in range(2)]
+
+
+def gen_d18(scale: float, rng: random.Random) -> str:
+    return ''.join(str(snailfish_number(rng)).replace(' ', '') + '\n'
+                   for _ in range(scaled(100, scale, minimum=2)))
+
+
+def rotations_3d() -> list[list[list[int]]]:
+    # The 24 axis permutations with sign flips that have a determinant of 1
+    rotations = []
+    for axes in itertools.permutations(range(3)):
+        inversions = sum(axes[i] > axes[j] for i, j in itertools.combinations(range(3), 2))
+        for signs in itertools.product((1, -1), repeat=3):
+            if (-1) ** inversions * math.prod(signs) == 1:
+                rotations.append([[signs[row] if col == axes[row] else 0 for col in range(3)]
+                                  for row in range(3)])
+    return rotations
+
+
+def gen_d19(scale: float, rng: random.Random) -> str:
+    # Put the scanners in a chain where each one sees at least 12 of the same
+    # beacons as the one before it and each sees every beacon in its range
+    def in_range(scanner: tuple[int, ...], beacon: tuple[int, ...]) -> bool:
+        return all(abs(s - b) <= 1000 for s, b in zip(scanner, beacon))
+
+    scanners = [(0, 0, 0)]
+    beacons: set[tuple[int, ...]] = set()
+    for _ in range(scaled(30, scale, minimum=2) - 1):
+        prev = scanners[-1]
+        scanners.append(tuple(p + rng.randint(-1100, 1100) for p in prev))  # type: ignore
+    for idx, scanner in enumerate(scanners):
+        if idx:
+            prev = scanners[idx - 1]
+            shared_min = [max(s, p) - 1000 for s, p in zip(scanner, prev)]
+            shared_max = [min(s, p) + 1000 for s, p in zip(scanner, prev)]
+            while sum(in_range(prev, b) and in_range(scanner, b) for b in beacons) < 12:
+                beacons.add(tuple(rng.randint(lo, hi) for lo, hi in zip(shared_min, shared_max)))
+        for _ in range(14):
+            beacons.add(tuple(s + rng.randint(-1000, 1000) for s in scanner))
+
+    rotations = rotations_3d()
+    reports = []
+    for idx, scanner in enumerate(scanners):
+        rotation = rotations[0] if idx == 0 else rng.choice(rotations)
+        seen = [tuple(b - s for b, s in zip(beacon, scanner))
+                for beacon in beacons if in_range(scanner, beacon)]
+        rng.shuffle(seen)
+        report = [f"--- scanner {idx} ---"]
+        for beacon in seen:
+            rotated = [sum(r * b for r, b in zip(row, beacon)) for row in rotation]
+            report.append(','.join(map(str, rotated)))
+        reports.append('\n'.join(report) + '\n')
+    return '\n'.join(reports)
+
+
+def gen_d20(scale: float, rng: random.Random) -> str:
+    algo = rng.choices('.#', k=512)
+    if algo[0] == '#':
+        # Otherwise the infinite image would stay lit
+        algo[511] = '.'
+    side = scaled_side(100, scale, minimum=2)
+    return ''.join(algo) + '\n\n' + digit_grid(side, side, rng, digits='.#')
+
+
+def gen_d21(scale: float, rng: random.Random) -> str:
+    # The game has a fixed size, scale doesn't mean anything
+    return ''.join(f"Player {player} starting position: {rng.randint(1, 10)}\n"
+                   for player in (1, 2))
+
+
+def gen_d22(scale: float, rng: random.Random) -> str:
+    lines = []
+    for step in range(scaled(420, scale)):
+        limit = 50 if step < 20 else 100000
+        size = 50 if step < 20 else 40000
+        ranges = []
+        for axis in 'xyz':
+            low = rng.randint(-limit, limit - 1)
+            ranges.append(f"{axis}={low}..{min(limit, low + rng.randint(0, size))}")
+        action = 'on' if step < 10 or rng.random() < 0.6 else 'off'
+        lines.append(f"{action} {','.join(ranges)}\n")
+    return ''.join(lines)
+
+
+def gen_d23(scale: float, rng: random.Random) -> str:
+    # The burrow has a fixed size, scale doesn't mean anything
+    amphipods = list('AABBCCDD')
+    solve = aoc.import_day('d23').p1p2
+    while True:
+        rng.shuffle(amphipods)
+        burrow = ("#############\n"
+                  "#...........#\n"
+                  f"###{'#'.join(amphipods[:4])}###\n"
+                  f"  #{'#'.join(amphipods[4:])}#\n"
+                  "  #########\n")
+        # Some burrows can't be sorted once unfolded for part 2 (which the
+        # solution answers with 0)
+        if all(solve(io.BytesIO(burrow.encode()))):
+            return burrow
+
+
+def gen_d24(scale: float, rng: random.Random) -> str:
+    # The solution has the MONAD constants built in and ignores its input
+    return (aoc.INPUT_DIR / 'd24').read_text()
+
+
+def gen_d25(scale: float, rng: random.Random) -> str:
+    width = scaled_side(139, scale, minimum=2)
+    height = scaled_side(137, scale, minimum=2)
+    return '\n'.join(''.join(rng.choices('.>v', weights=(5, 3, 3), k=width))
+                     for _ in range(height)) + '\n'
+
+
+GENERATORS: dict[str, Generator] = {
+    'd1': gen_d1, 'd2': gen_d2, 'd3': gen_d3, 'd4': gen_d4, 'd5': gen_d5,
+    'd6': gen_d6, 'd7': gen_d7, 'd8': gen_d8, 'd9': gen_d9, 'd10': gen_d10,
+    'd11': gen_d11, 'd12': gen_d12, 'd13': gen_d13, 'd14': gen_d14, 'd15': gen_d15,
+    'd16': gen_d16, 'd17': gen_d17, 'd18': gen_d18, 'd19': gen_d19, 'd20': gen_d20,
+    'd21': gen_d21, 'd22': gen_d22, 'd23': gen_d23, 'd24': gen_d24, 'd25': gen_d25,
+}
+
+
+def generate(day: str, scale: float = 1, seed: int = 0) -> str:
+    return GENERATORS[day](scale, random.Random(f"{day}-{scale}-{seed}"))
+
+
+def generated_input(day: str, scale: float = 1, seed: int = 0) -> pathlib.Path:
+    """Path to a generated input, only generating it if needed"""
+    version = GENERATOR_VERSIONS.get(day, 1)
+    path = GENERATED_DIR / (f"{day}-x{scale}-s{seed}" + (f"-v{version}" if version > 1 else ''))
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(generate(day, scale, seed))
+        tmp_path.replace(path)
+    return path
+
+
+def main(cli_args: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('day', choices=GENERATORS.keys())
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(cli_args)
+    sys.stdout.write(generate(args.day, args.scale, args.seed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
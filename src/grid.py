@@ -0,0 +1,121 @@
+"""
+Shared grid handling for the grid based days
+
+BitGrid is for boolean layers of a grid held as bitboards - a python int with
+bit (row * width + col) set for each cell that is on. A whole layer can then
+be shifted, masked and counted with a handful of big int operations instead
+of a python loop over every cell.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+
+class BitGrid:
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.full = (1 << self.size) - 1
+        # Bit 0 of every row, multiply by a row pattern to repeat it down the grid
+        self.row_repeat = self.full // ((1 << width) - 1)
+        # Building a column mask is a big multiply, shifts reuse the same few
+        self._cols_masks: dict[tuple[int, int], int] = {}
+
+    @classmethod
+    def from_lines(cls, lines: Sequence[str], on_chars: str) -> tuple[BitGrid, int]:
+        """The geometry and bitboard of the cells holding any of on_chars"""
+        bit_grid = cls(len(lines[0]), len(lines))
+        return bit_grid, bit_grid.board_from_lines(lines, on_chars)
+
+    def board_from_lines(self, lines: Iterable[str], on_chars: str) -> int:
+        board = 0
+        for row_num, line in enumerate(lines):
+            # Column 0 is the least significant bit so read the line backwards
+            row_bits = ''.join('1' if char in on_chars else '0' for char in reversed(line))
+            board |= int(row_bits, 2) << (row_num * self.width)
+        return board
+
+    def render(self, board: int, on: str = '#', off: str = '.') -> str:
+        bits = f"{board:0{self.size}b}"[::-1]
+        return '\n'.join(bits[row * self.width:(row + 1) * self.width]
+                         for row in range(self.height)).replace('1', on).replace('0', off)
+
+    def cols_mask(self, first: int, last: int) -> int:
+        """Every cell in columns first up to (not including) last"""
+        mask = self._cols_masks.get((first, last))
+        if mask is None:
+            mask = self._cols_masks[first, last] = ((1 << last) - (1 << first)) * self.row_repeat
+        return mask
+
+    def rows_mask(self, first: int, last: int) -> int:
+        """Every cell in rows first up to (not including) last"""
+        return (1 << (last * self.width)) - (1 << (first * self.width))
+
+    def shift(self, board: int, d_row: int = 0, d_col: int = 0,
+              wrap: bool = False, fill: bool = False) -> int:
+        """
+        Move every cell d_row rows down and d_col columns right. Cells moved
+        off the edge either wrap around to the other side or are lost, in
+        which case the cells left empty are set on if fill is True.
+        """
+        width, height = self.width, self.height
+        if d_col > 0:
+            moved = (board & self.cols_mask(0, width - d_col)) << d_col
+            if wrap:
+                moved |= (board & self.cols_mask(width - d_col, width)) >> (width - d_col)
+            elif fill:
+                moved |= self.cols_mask(0, d_col)
+            board = moved
+        elif d_col < 0:
+            moved = (board & self.cols_mask(-d_col, width)) >> -d_col
+            if wrap:
+                moved |= (board & self.cols_mask(0, -d_col)) << (width + d_col)
+            elif fill:
+                moved |= self.cols_mask(width + d_col, width)
+            board = moved
+
+        if d_row > 0:
+            moved = (board << (d_row * width)) & self.full
+            if wrap:
+                moved |= board >> ((height - d_row) * width)
+            elif fill:
+                moved |= self.rows_mask(0, d_row)
+            board = moved
+        elif d_row < 0:
+            moved = board >> (-d_row * width)
+            if wrap:
+                moved |= (board << ((height + d_row) * width)) & self.full
+            elif fill:
+                moved |= self.rows_mask(height + d_row, height)
+            board = moved
+        return board
+
+    def neighbours(self, board: int, diagonals: bool = False, wrap: bool = False,
+                   fill: bool = False) -> list[int]:
+        """
+        One board per direction where each cell is set if its neighbour in
+        that direction is set in board. Directions go row by row from the top
+        left.
+        """
+        if diagonals:
+            directions = [(d_row, d_col) for d_row in (-1, 0, 1) for d_col in (-1, 0, 1)
+                          if d_row or d_col]
+        else:
+            directions = [(-1, 0), (0, -1), (0, 1), (1, 0)]
+        # A cell sees its neighbour at (d_row, d_col) by moving the board the
+        # opposite way
+        return [self.shift(board, -d_row, -d_col, wrap, fill)
+                for d_row, d_col in directions]
+
+    def padded(self, board: int, pad: int, fill: bool = False) -> tuple[BitGrid, int]:
+        """The board moved into a grid with pad extra cells on every side"""
+        bit_grid = BitGrid(self.width + 2 * pad, self.height + 2 * pad)
+        padded_board = bit_grid.full if fill else 0
+        inner = bit_grid.rows_mask(pad, pad + self.height) & bit_grid.cols_mask(pad, pad + self.width)
+        padded_board &= ~inner
+        for row in range(self.height):
+            row_bits = (board >> (row * self.width)) & ((1 << self.width) - 1)
+            padded_board |= row_bits << ((row + pad) * bit_grid.width + pad)
+        return bit_grid, padded_board
@@ -0,0 +1,176 @@
+"""
+Cache of parsed puzzle inputs
+
+Parsed inputs are keyed by the parser, its version and a hash of the input
+file's content. The most recently used are kept in memory and more of them
+are pickled to disk so later runs can skip parsing too. The disk cache
+drops entries from a parser's old versions whenever it stores a new one.
+
+Parsers using the cache must return plain builtin types (tuples, strs, ints
+...) rather than classes from the day modules, so the pickles can be loaded
+whether the day was run as a script or imported, and the solutions must not
+mutate what they're given since it is shared between calls.
+"""
+
+import os
+import pickle
+import hashlib
+import pathlib
+import functools
+import contextlib
+import collections
+
+from typing import Any, Callable, TypeVar
+
+import aoc
+
+
+T = TypeVar('T')
+
+CACHE_DIR = pathlib.Path(os.environ.get('AOC_CACHE_DIR',
+                                        aoc.REPO_ROOT / '.cache' / 'parsed'))
+
+# Set to False to always parse (e.g. to benchmark the parsers)
+enabled = os.environ.get('AOC_NO_INPUT_CACHE') is None
+disk_enabled = True
+# Most parsed inputs and input file digests to keep in memory, the least
+# recently used are dropped beyond that so a long running process stays
+# bounded
+memory_cache_size = 32
+file_digests_size = 1024
+# Most parsed inputs to keep on disk, the least recently used are deleted
+# beyond that
+disk_cache_size = 256
+
+_memory_cache: collections.OrderedDict[tuple[str, int, str], Any] = collections.OrderedDict()
+# Input file -> (mtime, size, digest) to avoid rehashing unchanged files
+_file_digests: collections.OrderedDict[str, tuple[int, int, str]] = collections.OrderedDict()
+
+
+def file_digest(input_file: str) -> str:
+    input_file = os.path.abspath(input_file)
+    stat = os.stat(input_file)
+    known = _file_digests.get(input_file)
+    if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+        _file_digests.move_to_end(input_file)
+        return known[2]
+
+    # hashlib.file_digest needs python 3.11
+    sha256 = hashlib.sha256()
+    with open(input_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(aoc.CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    digest = sha256.hexdigest()
+    if known is not None and known[2] != digest:
+        # The file has changed, drop what was parsed from its old content
+        # unless another input file has the same content
+        if not any(other[2] == known[2] for path, other in _file_digests.items()
+                   if path != input_file):
+            for key in [key for key in _memory_cache if key[2] == known[2]]:
+                del _memory_cache[key]
+    _file_digests[input_file] = (stat.st_mtime_ns, stat.st_size, digest)
+    _file_digests.move_to_end(input_file)
+    while len(_file_digests) > file_digests_size:
+        _file_digests.popitem(last=False)
+    return digest
+
+
+def clear() -> None:
+    """Empty the in memory cache, the on disk one is left alone"""
+    _memory_cache.clear()
+    _file_digests.clear()
+
+
+def _remember(key: tuple[str, int, str], parsed: Any) -> None:
+    _memory_cache[key] = parsed
+    while len(_memory_cache) > memory_cache_size:
+        _memory_cache.popitem(last=False)
+
+
+def _load(cache_file: pathlib.Path) -> Any:
+    with open(cache_file, 'rb') as f:
+        parsed = pickle.load(f)
+    # Mark it used for _prune, not being able to isn't fatal
+    with contextlib.suppress(OSError):
+        os.utime(cache_file)
+    return parsed
+
+
+def _store(cache_file: pathlib.Path, parsed: Any) -> None:
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename so a concurrent reader never sees half a pickle
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(parsed, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+
+
+def _prune(name: str, version: int) -> None:
+    """
+    Delete name's entries from other versions of the parser, which can never
+    be used again, and the least recently used entries beyond disk_cache_size
+    """
+    cache_files = []
+    for cache_file in CACHE_DIR.glob('*.pickle'):
+        try:
+            if (cache_file.name.startswith(f"{name}-v") and
+                    not cache_file.name.startswith(f"{name}-v{version}-")):
+                cache_file.unlink()
+            else:
+                cache_files.append((cache_file.stat().st_mtime_ns, cache_file))
+        except FileNotFoundError:
+            # Another process got there first
+            pass
+    cache_files.sort()
+    for _, cache_file in cache_files[:max(0, len(cache_files) - disk_cache_size)]:
+        cache_file.unlink(missing_ok=True)
+
+
+def cached_parser(version: int) -> Callable[[Callable[[aoc.InputType], T]],
+                                            Callable[[aoc.InputType], T]]:
+    """
+    Decorator for a function that parses an input file. Bump version whenever
+    the parser's output changes so stale cache entries are ignored.
+    """
+    def decorator(parser: Callable[[aoc.InputType], T]) -> Callable[[aoc.InputType], T]:
+        # Name by the source file rather than __module__ which is __main__
+        # when a day is run as a script. A parser compiled by mypyc has no
+        # code object but then it can't have been run as a script either.
+        code = getattr(parser, '__code__', None)
+        module = pathlib.Path(code.co_filename).stem if code else parser.__module__
+        name = f"{module}.{parser.__qualname__}"
+
+        @functools.wraps(parser)
+        def wrapper(input_file: aoc.InputType) -> T:
+            # A stream can only be read once, there's nothing to key it on
+            if not enabled or not isinstance(input_file, str) or input_file == aoc.STDIN:
+                return parser(input_file)
+
+            key = (name, version, file_digest(input_file))
+            if key in _memory_cache:
+                _memory_cache.move_to_end(key)
+                parsed: T = _memory_cache[key]
+                return parsed
+
+            cache_file = CACHE_DIR / f"{name}-v{version}-{key[2]}.pickle"
+            if disk_enabled and cache_file.exists():
+                try:
+                    parsed = _load(cache_file)
+                    _remember(key, parsed)
+                    return parsed
+                except Exception:
+                    # Unreadable e.g. truncated, just parse it again
+                    pass
+
+            parsed = parser(input_file)
+            if disk_enabled:
+                try:
+                    _store(cache_file, parsed)
+                    _prune(name, version)
+                except OSError:
+                    # Not being able to cache isn't fatal
+                    pass
+            _remember(key, parsed)
+            return parsed
+        return wrapper
+    return decorator
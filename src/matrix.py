@@ -0,0 +1,57 @@
+"""
+Shared matrix handling for the days that count things through a linear step
+
+A step that takes a vector of counts to the next counts is a square matrix,
+so many steps are the matrix raised to the number of steps. The powers by
+repeated squaring are kept so advancing any number of steps is a matrix
+vector product per set bit of it. Matrices and vectors are tuples of python
+ints, optionally reduced modulo a modulus to keep them small.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+
+Matrix = tuple[tuple[int, ...], ...]
+Vector = tuple[int, ...]
+# Powers of a matrix by repeated squaring, kept per modulus
+Powers = dict[Optional[int], list[Matrix]]
+
+
+def mat_mul(a: Matrix, b: Matrix, modulus: Optional[int]) -> Matrix:
+    columns = list(zip(*b))
+    product = tuple(tuple(sum(map(int.__mul__, row, column)) for column in columns)
+                    for row in a)
+    if modulus is None:
+        return product
+    return tuple(tuple(value % modulus for value in row) for row in product)
+
+
+def apply(matrix: Matrix, vector: Vector, modulus: Optional[int]) -> Vector:
+    product = tuple(sum(map(int.__mul__, row, vector)) for row in matrix)
+    if modulus is None:
+        return product
+    return tuple(value % modulus for value in product)
+
+
+def doubling_powers(base: Matrix, powers: Powers, num_powers: int,
+                    modulus: Optional[int]) -> list[Matrix]:
+    """
+    base ** (2 ** i) at index i for at least the first num_powers, adding
+    any missing to those kept in powers for the modulus
+    """
+    modulus_powers = powers.setdefault(modulus, [base])
+    while len(modulus_powers) < num_powers:
+        modulus_powers.append(mat_mul(modulus_powers[-1], modulus_powers[-1], modulus))
+    return modulus_powers
+
+
+def advance(base: Matrix, powers: Powers, vector: Vector, steps: int,
+            modulus: Optional[int]) -> Vector:
+    """The vector after steps applications of base"""
+    for bit, power in enumerate(doubling_powers(base, powers, steps.bit_length(),
+                                                modulus)[:steps.bit_length()]):
+        if steps >> bit & 1:
+            vector = apply(power, vector, modulus)
+    return vector
@@ -1,22 +1,68 @@
 #!/bin/env python3
 
+import io
+import os
 import sys
-import pathlib
-import subprocess
+import time
+import contextlib
+import dataclasses
+import concurrent.futures
+
+from typing import Any
+
+import aoc
+
+
+@dataclasses.dataclass
+class DayResult:
+    day: str
+    input_name: str
+    results: list[tuple[str, Any]]
+    wall_time: float
+    cpu_time: float
+
+
+def solve_day(day: str, input_file: str) -> DayResult:
+    # Runs in a pool worker, each worker only imports a day module once
+    day_mod = aoc.import_day(day)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    # The solutions print their own debug output, keep that out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = [(part, part_function(input_file))
+                   for part, part_function in aoc.part_functions(day_mod)]
+    return DayResult(day, os.path.basename(input_file), results,
+                     time.perf_counter() - wall_start,
+                     time.process_time() - cpu_start)
+
+
+def print_report(day_results: list[DayResult], elapsed: float) -> None:
+    for day_result in day_results:
+        print(f"{day_result.input_name:<12} wall {day_result.wall_time:9.6f}s "
+              f"cpu {day_result.cpu_time:9.6f}s")
+        for part, result in day_result.results:
+            print(f"    {part}: {result!r}")
+    total_cpu = sum(day_result.cpu_time for day_result in day_results)
+    print(f"Total CPU: {total_cpu:.6f}s")
+    print(f"Elapsed: {elapsed:.6f}s")
 
 
 def main(cli_args: list[str]) -> int:
-    repo_root = pathlib.Path(__file__).resolve().parent.parent
-    for soln in sorted(repo_root.glob('src/d*.py')):
-        day_input = repo_root / 'input' / soln.stem
-        if cli_args and cli_args[0] == 'example':
-            print(f"{soln.stem} example input:")
-            subprocess.run([soln, day_input.with_stem(f"{soln.stem}-example")], check=True)
-        print(f"{soln.stem} full input:")
-        subprocess.run([soln, day_input], check=True)
+    start = time.perf_counter()
+    examples = bool(cli_args) and cli_args[0] == 'example'
+    puzzles = []
+    for day in aoc.day_names():
+        if examples:
+            puzzles.append((day, str(aoc.input_path(day, example=True))))
+        puzzles.append((day, str(aoc.input_path(day))))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        futures = [pool.submit(solve_day, day, input_file)
+                   for day, input_file in puzzles]
+        day_results = [future.result() for future in futures]
 
+    print_report(day_results, time.perf_counter() - start)
     return 0
 
 
 if __name__ == "__main__":
-    sys.exit(main(sys.argv[1:]))
\ No newline at end of file
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,227 @@
+#!/bin/env python3
+"""
+Long running solver daemon listening on a local Unix socket
+
+Every day module is imported once up front and the worker processes keep the
+most recently parsed inputs warm between requests, so a request only pays for
+solving. Only the days whose parsers use input_cache.cached_parser are kept
+warm, the others parse their input on every request. Inline input is written
+to a file for the request only and its parse isn't pickled to disk, so the
+daemon doesn't fill the disk with one-off inputs. Requests and responses are
+single lines of JSON:
+
+    {"day": "d15", "part": "p1p2", "input_file": "/path/to/input"}
+    {"day": "d6", "input": "3,4,3,1,2\\n"}
+
+part is optional (default every part of the day) and the input is either a
+path or given inline. The response has the repr of each part's result with
+its timing:
+
+    {"ok": true, "results": [{"part": "p1p2", "result": "(40, 315)", "time": 0.01}]}
+    {"ok": false, "error": "..."}
+"""
+
+import io
+import os
+import sys
+import json
+import stat
+import time
+import signal
+import socket
+import pathlib
+import argparse
+import tempfile
+import contextlib
+import socketserver
+import concurrent.futures
+
+from typing import Any, Iterator, Optional
+
+import aoc
+import input_cache
+
+
+DEFAULT_SOCKET = os.environ.get(
+    'AOC_SOLVERD_SOCKET',
+    os.path.join(tempfile.gettempdir(), f"aoc2021-solverd-{os.getuid()}.sock"))
+INLINE_INPUT_DIR = aoc.REPO_ROOT / '.cache' / 'inline'
+
+
+def solve(day: str, parts: Optional[list[str]], input_file: str,
+          disk_cache: bool = True) -> list[dict[str, Any]]:
+    """Runs in a pool worker"""
+    results = []
+    was_disk_enabled = input_cache.disk_enabled
+    input_cache.disk_enabled = was_disk_enabled and disk_cache
+    try:
+        for part, part_function in aoc.part_functions(aoc.import_day(day)):
+            if parts and part not in parts:
+                continue
+            start = time.perf_counter()
+            # The solutions print their own debug output, keep that out of the response
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = part_function(input_file)
+            results.append({'part': part, 'result': repr(result),
+                            'time': time.perf_counter() - start})
+    finally:
+        input_cache.disk_enabled = was_disk_enabled
+    return results
+
+
+@contextlib.contextmanager
+def inline_input_file(input_text: str) -> Iterator[str]:
+    """
+    Inline input saved to a file for the length of a request. Its parse is
+    still cached in memory by content like any other file's.
+    """
+    INLINE_INPUT_DIR.mkdir(parents=True, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=INLINE_INPUT_DIR)
+    try:
+        with open(fd, 'w') as f:
+            f.write(input_text)
+        yield path
+    finally:
+        os.unlink(path)
+
+
+class SolverServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, pool: concurrent.futures.Executor) -> None:
+        self.pool = pool
+        self.days = set(aoc.day_names())
+        super().__init__(socket_path, SolveRequestHandler)
+
+    def handle_request_json(self, request: dict[str, Any]) -> dict[str, Any]:
+        day = request.get('day')
+        if day not in self.days:
+            return {'ok': False, 'error': f"Unknown day {day!r}"}
+        parts = [request['part']] if request.get('part') else None
+        start = time.perf_counter()
+        try:
+            if 'input' in request:
+                with inline_input_file(request['input']) as input_file:
+                    results = self.pool.submit(solve, day, parts, input_file,
+                                               disk_cache=False).result()
+            elif 'input_file' in request:
+                results = self.pool.submit(solve, day, parts,
+                                           str(request['input_file'])).result()
+            else:
+                return {'ok': False, 'error': "Need one of input or input_file"}
+        except Exception as exc:
+            return {'ok': False, 'error': f"{type(exc).__name__}: {exc}"}
+        if not results:
+            return {'ok': False, 'error': f"{day} has no part {request.get('part')!r}"}
+        return {'ok': True, 'results': results,
+                'elapsed': time.perf_counter() - start}
+
+
+class SolveRequestHandler(socketserver.StreamRequestHandler):
+    server: SolverServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as exc:
+                response = {'ok': False, 'error': f"Bad request: {exc}"}
+            else:
+                response = self.server.handle_request_json(request)
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+            self.wfile.flush()
+
+
+def socket_in_use(socket_path: str) -> bool:
+    """
+    True if a daemon is listening on the socket. A socket left behind by one
+    that's gone refuses connections and is removed so it can be listened on
+    again.
+    """
+    if not os.path.exists(socket_path):
+        return False
+    if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+        raise FileExistsError(f"{socket_path} exists and isn't a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except ConnectionRefusedError:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(socket_path)
+            return False
+        except FileNotFoundError:
+            return False
+    return True
+
+
+def serve(socket_path: str, workers: Optional[int]) -> int:
+    if socket_in_use(socket_path):
+        print(f"A daemon is already serving on {socket_path}", file=sys.stderr)
+        return 1
+    # Import every day before the pool forks so the workers start with them
+    for day in aoc.day_names():
+        aoc.import_day(day)
+    # Clean up the socket when stopped by a plain kill too
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        # Start the workers before the socket is opened so they don't inherit
+        # it, workers outliving a killed daemon would keep it accepting
+        # connections that are never answered
+        pool.submit(int).result()
+        with SolverServer(socket_path, pool) as server:
+            print(f"Serving on {socket_path}", flush=True)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os.unlink(socket_path)
+    return 0
+
+
+def request(request: dict[str, Any], socket_path: str = DEFAULT_SOCKET) -> dict[str, Any]:
+    """Send a single request to a running daemon and wait for the response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile('rwb') as sock_file:
+            sock_file.write(json.dumps(request).encode() + b'\n')
+            sock_file.flush()
+            response: dict[str, Any] = json.loads(sock_file.readline())
+    return response
+
+
+def main(cli_args: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Advent Of Code 2021 solver daemon")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help="Run the daemon")
+    serve_parser.add_argument('--workers', type=int, default=os.cpu_count())
+    solve_parser = subparsers.add_parser('solve', help="Ask a running daemon to solve")
+    solve_parser.add_argument('day')
+    solve_parser.add_argument('input_file', help="Input file or - to send stdin inline")
+    solve_parser.add_argument('--part')
+    args = parser.parse_args(cli_args)
+
+    if args.command == 'serve':
+        try:
+            return serve(args.socket, args.workers)
+        except FileExistsError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+
+    solve_request: dict[str, Any] = {'day': args.day, 'part': args.part}
+    if args.input_file == '-':
+        solve_request['input'] = sys.stdin.read()
+    else:
+        solve_request['input_file'] = str(pathlib.Path(args.input_file).resolve())
+    response = request(solve_request, args.socket)
+    if not response['ok']:
+        print(response['error'], file=sys.stderr)
+        return 1
+    for result in response['results']:
+        print(f"{result['part']}: {result['result']} ({result['time']:.6f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
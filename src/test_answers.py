@@ -1,31 +1,15 @@
-import re
+import time
 import pytest
-import pathlib
 import importlib
 
+from typing import Optional
 
-puzzle_re = re.compile(r"(?P<day>d[0-9]+)(?P<part>[^ ]+) (?P<input_file>[^ ]+) (?P<result>.*)")
+import aoc
 
 
 def get_puzzle_info(examples: bool) -> list[tuple[str, str, str, str]]:
-    day_parts = []
-    repo_root = pathlib.Path(__file__).resolve().parent.parent
-    with open(repo_root / 'answers') as f:
-        for line in f:
-            m = puzzle_re.match(line)
-            if m is None:
-                continue
-            day = m.group('day')
-            part = m.group('part')
-            input_file = m.group('input_file')
-            is_example = 'example' in input_file
-            result = m.group('result')
-            if is_example and examples:
-                day_parts.append((day, part, str(repo_root / "input" / input_file), result))
-            elif not is_example and not examples:
-                day_parts.append((day, part, str(repo_root / "input" / input_file), result))
-
-    return day_parts
+    return [(puzzle.day, puzzle.part, puzzle.input_file, puzzle.result)
+            for puzzle in aoc.get_puzzles(examples)]
 
 
 @pytest.mark.parametrize("day,part,input_file,result", get_puzzle_info(True))
@@ -36,9 +20,17 @@ def test_puzzle_examples(day: str, part: str, input_file: str, result: str) -> N
     assert part_function(input_file) == result_val
 
 
-@pytest.mark.parametrize("day,part,input_file,result", get_puzzle_info(False))
-def test_puzzles(day: str, part: str, input_file: str, result: str) -> None:
+@pytest.mark.parametrize("day,part,input_file,result,budget",
+                         [(puzzle.day, puzzle.part, puzzle.input_file, puzzle.result, puzzle.budget)
+                          for puzzle in aoc.get_puzzles(False)])
+def test_puzzles(day: str, part: str, input_file: str, result: str,
+                 budget: Optional[float]) -> None:
     day_mod = importlib.__import__(day)
     part_function = getattr(day_mod, part)
     result_val = eval(result)
+    start = time.perf_counter()
     assert part_function(input_file) == result_val
+    elapsed = time.perf_counter() - start
+    if budget is not None and elapsed > budget:
+        pytest.fail(f"{day}{part} took {elapsed:.3f}s, {elapsed - budget:.3f}s "
+                    f"({100 * (elapsed - budget) / budget:.0f}%) over its {budget}s budget")
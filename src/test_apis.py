@@ -0,0 +1,208 @@
+import io
+import os
+import pathlib
+import pytest
+
+from typing import Any, Callable, Iterator
+
+import aoc
+import d2
+import d6
+import d7
+import d8
+import d10
+import d12
+import d14
+import input_cache
+
+
+def test_d6_populations_modulus() -> None:
+    counts = d6.read_counts(str(aoc.input_path('d6', example=True)))
+    horizons = (256, 18, 0, 80)
+    assert d6.populations(counts, horizons) == [26984457539, 26, 5, 5934]
+    for modulus in (7, 1000, 1 << 61):
+        assert d6.populations(counts, horizons, modulus) == [
+            total % modulus for total in d6.populations(counts, horizons)]
+
+
+def test_d6_populations_backwards() -> None:
+    with pytest.raises(ValueError):
+        d6.populations((1,) * d6.NUM_TIMERS, (10, -1))
+
+
+def test_d7_curve() -> None:
+    positions = [16, 1, 2, 0, 4, 2, 7, 1, 2, 14]
+    fuel_costs = d7.FuelCosts(positions)
+    linear = fuel_costs.curve()
+    triangular = fuel_costs.curve(triangular=True)
+    assert [target for target, _ in linear] == list(range(0, 17))
+    assert linear == [(target, sum(abs(position - target) for position in positions))
+                      for target in range(0, 17)]
+    assert triangular == [(target, sum(abs(position - target) * (abs(position - target) + 1) // 2
+                                       for position in positions))
+                          for target in range(0, 17)]
+    assert (min(linear, key=lambda target_fuel: target_fuel[1]) ==
+            fuel_costs.best_linear() == (2, 37))
+    assert (min(triangular, key=lambda target_fuel: target_fuel[1]) ==
+            fuel_costs.best_triangular() == (5, 168))
+
+
+def test_d12_paths() -> None:
+    graph = d12.graph_from_input(str(aoc.input_path('d12', example=True)))
+    once = set(d12.paths(graph['start'], allow_small_twice=False))
+    assert once == {
+        ('start', 'A', 'b', 'A', 'c', 'A', 'end'), ('start', 'A', 'b', 'A', 'end'),
+        ('start', 'A', 'b', 'end'), ('start', 'A', 'c', 'A', 'b', 'A', 'end'),
+        ('start', 'A', 'c', 'A', 'b', 'end'), ('start', 'A', 'c', 'A', 'end'),
+        ('start', 'A', 'end'), ('start', 'b', 'A', 'c', 'A', 'end'),
+        ('start', 'b', 'A', 'end'), ('start', 'b', 'end')}
+    twice = list(d12.paths(graph['start']))
+    assert len(twice) == len(set(twice)) == 36
+    assert once < set(twice)
+    assert (len(once), len(twice)) == d12.count_paths(graph['start'])
+
+
+def test_d14_element_counts_after() -> None:
+    polymer = d14.read_polymer(str(aoc.input_path('d14', example=True)))
+    after_10, after_0, after_40 = polymer.element_counts_after((10, 0, 40))
+    assert after_0 == {'N': 2, 'C': 1, 'B': 1}
+    assert after_10 == {'B': 1749, 'C': 298, 'H': 161, 'N': 865}
+    assert max(after_40.values()) - min(after_40.values()) == 2188189693529
+    modulus = 1_000_000_007
+    assert polymer.element_counts_after((40, 10), modulus) == [
+        {element: count % modulus for element, count in counts.items()}
+        for counts in (after_40, after_10)]
+
+
+def test_d14_element_counts_backwards() -> None:
+    polymer = d14.read_polymer(str(aoc.input_path('d14', example=True)))
+    with pytest.raises(ValueError):
+        polymer.element_counts_after((-1,))
+
+
+@pytest.fixture
+def cache_dir(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[pathlib.Path]:
+    """An empty input cache, on disk in a temporary directory"""
+    monkeypatch.setattr(input_cache, 'CACHE_DIR', tmp_path / 'cache')
+    monkeypatch.setattr(input_cache, 'enabled', True)
+    monkeypatch.setattr(input_cache, 'disk_enabled', True)
+    input_cache.clear()
+    yield tmp_path / 'cache'
+    input_cache.clear()
+
+
+def test_input_cache_invalidation(cache_dir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    parsed_contents = []
+
+    @input_cache.cached_parser(version=1)
+    def read_text(input_file: aoc.InputType) -> str:
+        with aoc.open_input(input_file) as f:
+            parsed_contents.append(f.read())
+        return parsed_contents[-1]
+
+    input_file = tmp_path / 'input'
+    input_file.write_text('first\n')
+    assert read_text(str(input_file)) == read_text(str(input_file)) == 'first\n'
+    assert parsed_contents == ['first\n']
+
+    # Changing the file's content means parsing it again
+    input_file.write_text('second one\n')
+    assert read_text(str(input_file)) == 'second one\n'
+    assert parsed_contents == ['first\n', 'second one\n']
+
+    # Another file with the same content shares what was parsed
+    other_file = tmp_path / 'other'
+    other_file.write_text('second one\n')
+    assert read_text(str(other_file)) == 'second one\n'
+    assert len(parsed_contents) == 2
+
+    # A new run only has the disk cache, which holds both contents
+    input_cache.clear()
+    input_file.write_text('first\n')
+    assert read_text(str(input_file)) == 'first\n'
+    assert len(parsed_contents) == 2
+    assert len(list(cache_dir.glob('*.pickle'))) == 2
+
+
+def test_input_cache_version(cache_dir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    input_file = tmp_path / 'input'
+    input_file.write_text('1,2,3\n')
+
+    @input_cache.cached_parser(version=1)
+    def read_numbers(input_file: aoc.InputType) -> tuple[int, ...]:
+        with aoc.open_input(input_file) as f:
+            return tuple(int(number) for number in f.read().split(','))
+    assert read_numbers(str(input_file)) == (1, 2, 3)
+
+    # A changed parser with its version bumped doesn't see the old output
+    @input_cache.cached_parser(version=2)  # type: ignore[no-redef]
+    def read_numbers(input_file: aoc.InputType) -> tuple[int, ...]:
+        with aoc.open_input(input_file) as f:
+            return tuple(-int(number) for number in f.read().split(','))
+    assert read_numbers(str(input_file)) == (-1, -2, -3)
+    # and the old version's entry is gone from disk
+    assert [cache_file.name.split('-')[1] for cache_file in cache_dir.glob('*.pickle')] == ['v2']
+
+
+def test_input_cache_disk_size(cache_dir: pathlib.Path, tmp_path: pathlib.Path,
+                               monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(input_cache, 'disk_cache_size', 2)
+    parsed_contents = []
+
+    @input_cache.cached_parser(version=1)
+    def read_text(input_file: aoc.InputType) -> str:
+        with aoc.open_input(input_file) as f:
+            parsed_contents.append(f.read())
+        return parsed_contents[-1]
+
+    input_files = [tmp_path / f"input{num}" for num in range(3)]
+    for num, input_file in enumerate(input_files):
+        input_file.write_text(f"{num}\n")
+    read_text(str(input_files[0]))
+    read_text(str(input_files[1]))
+    for cache_file in cache_dir.glob('*.pickle'):
+        os.utime(cache_file, ns=(0, 0))
+    # Loading input0 from disk leaves input1 the least recently used, so
+    # it's the one to go when input2 is stored
+    input_cache.clear()
+    read_text(str(input_files[0]))
+    read_text(str(input_files[2]))
+    assert len(list(cache_dir.glob('*.pickle'))) == 2
+    assert parsed_contents == ['0\n', '1\n', '2\n']
+
+    input_cache.clear()
+    for num in (0, 2, 1):
+        read_text(str(input_files[num]))
+    assert parsed_contents == ['0\n', '1\n', '2\n', '1\n']
+
+
+def test_chunk_bounds(tmp_path: pathlib.Path) -> None:
+    input_file = tmp_path / 'input'
+    input_file.write_bytes(b'a\nbb\n\nccc\ndddd')
+    for num_chunks in range(1, 9):
+        bounds = aoc.chunk_bounds(str(input_file), num_chunks)
+        assert len(bounds) == num_chunks + 1
+        assert bounds[0] == 0 and bounds[-1] == 14
+        assert bounds == sorted(bounds)
+        # Every chunk starts at the start of a line
+        assert all(bound in (0, 2, 5, 6, 10, 14) for bound in bounds)
+
+
+@pytest.mark.parametrize("p1p2", [d2.p1p2, d8.p1p2, d10.p1p2])
+def test_map_reduce_chunks_pool(p1p2: Callable[[aoc.InputType], tuple[int, int]],
+                                monkeypatch: pytest.MonkeyPatch) -> None:
+    """Splitting the input over the process pool gives the same as streaming it"""
+    input_file = aoc.input_path(p1p2.__module__)
+    streamed = p1p2(io.BytesIO(input_file.read_bytes()))
+    monkeypatch.setattr(aoc, 'PARALLEL_MIN_BYTES', 0)
+    monkeypatch.setattr(aoc, 'MAX_CHUNK_BYTES', 1000)
+    map_chunks = aoc.map_chunks
+    num_chunks = []
+
+    def counted_map_chunks(*args: Any) -> list[Any]:
+        results = map_chunks(*args)
+        num_chunks.append(len(results))
+        return results
+    monkeypatch.setattr(aoc, 'map_chunks', counted_map_chunks)
+    assert p1p2(str(input_file)) == streamed
+    assert num_chunks[0] > 1